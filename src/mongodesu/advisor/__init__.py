@@ -0,0 +1,8 @@
+from .advisor import QueryAdvisor, Finding, IndexSuggestion, classify_plan
+
+__all__ = [
+    "QueryAdvisor",
+    "Finding",
+    "IndexSuggestion",
+    "classify_plan"
+]
@@ -0,0 +1,234 @@
+import logging
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from mongodesu.fields.base import Field
+from mongodesu.instrumentation.hooks import Instrument, QueryEvent, filter_fields, indexed_fields, shape_key
+
+EXPLAINED_OPERATIONS = ("find", "find_one", "count_documents", "update_one", "update_many", "delete_one",
+                        "delete_many")
+
+COLLSCAN = "COLLSCAN"
+IXSCAN = "IXSCAN"
+
+
+def plan_stages(plan: Mapping[str, Any]) -> List[str]:
+    """Returns the names of all the stages in the plan tree, outer stages first."""
+    stages = []
+    pending = [plan]
+    while pending:
+        stage = pending.pop(0)
+        if "stage" in stage:
+            stages.append(stage["stage"])
+        if "inputStage" in stage:
+            pending.append(stage["inputStage"])
+        pending.extend(stage.get("inputStages", []))
+        if "queryPlan" in stage: # Slot based engine plans nest the classic plan
+            pending.append(stage["queryPlan"])
+    return stages
+
+
+def plan_indexes(plan: Mapping[str, Any]) -> List[str]:
+    names = []
+    pending = [plan]
+    while pending:
+        stage = pending.pop(0)
+        if stage.get("indexName"):
+            names.append(stage["indexName"])
+        if "inputStage" in stage:
+            pending.append(stage["inputStage"])
+        pending.extend(stage.get("inputStages", []))
+        if "queryPlan" in stage:
+            pending.append(stage["queryPlan"])
+    return names
+
+
+def classify_plan(plan: Mapping[str, Any]) -> str:
+    """Classify the winning plan as `COLLSCAN`, `IXSCAN` or the name of its outer stage."""
+    stages = plan_stages(plan)
+    if COLLSCAN in stages:
+        return COLLSCAN
+    if any(stage in (IXSCAN, "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_IDHACK", "COUNT_SCAN", "DISTINCT_SCAN")
+           for stage in stages):
+        return IXSCAN
+    return stages[0] if stages else "UNKNOWN"
+
+
+class Finding:
+    """The explain results aggregated for one model and filter shape."""
+
+    def __init__(self, model: Any, filter_shape: Any, fields: List[str]) -> None:
+        self.model = model
+        self.filter_shape = filter_shape
+        self.fields = fields
+        self.operations: Set[str] = set()
+        self.samples = 0
+        self.plans: Dict[str, int] = {}
+        self.indexes_used: Set[str] = set()
+        self.docs_examined = 0
+        self.keys_examined = 0
+        self.returned = 0
+
+    @property
+    def model_name(self) -> str:
+        return self.model.__name__
+
+    @property
+    def collscans(self) -> int:
+        return self.plans.get(COLLSCAN, 0)
+
+    @property
+    def examined_ratio(self) -> float:
+        """Documents examined per document returned over all the samples."""
+        return self.docs_examined / max(self.returned, 1)
+
+    def add(self, operation: str, plan: str, indexes: Iterable[str], stats: Mapping[str, Any]) -> None:
+        self.operations.add(operation)
+        self.samples += 1
+        self.plans[plan] = self.plans.get(plan, 0) + 1
+        self.indexes_used.update(indexes)
+        self.docs_examined += stats.get("totalDocsExamined", 0)
+        self.keys_examined += stats.get("totalKeysExamined", 0)
+        self.returned += stats.get("nReturned", 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "filter": self.filter_shape,
+            "operations": sorted(self.operations),
+            "samples": self.samples,
+            "plans": dict(self.plans),
+            "indexes_used": sorted(self.indexes_used),
+            "docs_examined": self.docs_examined,
+            "keys_examined": self.keys_examined,
+            "returned": self.returned,
+            "examined_ratio": self.examined_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return f"Finding({self.to_dict()})"
+
+
+class IndexSuggestion:
+    """An index suggested for a finding, in the terms of the fields declared on the model."""
+
+    def __init__(self, finding: Finding, fields: List[str], message: str) -> None:
+        self.finding = finding
+        self.fields = fields
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"IndexSuggestion({self.message!r})"
+
+
+class QueryAdvisor(Instrument):
+    """
+    Runs `explain` on a sampled fraction of the model queries and aggregates the plans per model and filter shape,
+    to find the collection scans and suggest the indexes to declare. Meant for the development and staging
+    environments, the sampled queries pay for an extra `explain` round trip.
+
+        >>> from mongodesu.advisor import QueryAdvisor
+        >>> from mongodesu.instrumentation import register
+        >>> advisor = register(QueryAdvisor(sample_rate=0.1))
+        >>> ...
+        >>> for suggestion in advisor.suggestions():
+        ...     print(suggestion) # mark `User.email` index=True
+
+    Args:
+        sample_rate (float, optional): The fraction of the queries to explain, between 0 and 1. Defaults to 0.1.
+        ratio_threshold (float, optional): The documents examined per document returned from which an index scan is
+            still reported as inefficient. Defaults to 10.
+        operations (Iterable[str], optional): The operations to explain.
+        seed (Union[int, None], optional): Seed of the sampling, for reproducible sampling in tests.
+    """
+
+    def __init__(self,
+                 sample_rate: float = 0.1,
+                 ratio_threshold: float = 10,
+                 operations: Iterable[str] = EXPLAINED_OPERATIONS,
+                 seed: Union[int, None] = None) -> None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate should be between 0 and 1.")
+        self.sample_rate = sample_rate
+        self.ratio_threshold = ratio_threshold
+        self.operations = frozenset(operations)
+        self.enabled = True
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._findings: Dict[Tuple[str, str], Finding] = {}
+
+    def after(self, event: QueryEvent) -> None:
+        if not self.enabled or event.error is not None or event.operation not in self.operations:
+            return
+        if event.collection is None or self._random.random() >= self.sample_rate:
+            return
+        try:
+            explained = self.explain(event)
+        except Exception:
+            logging.getLogger("mongodesu.advisor").debug("explain failed for %r", event, exc_info=True)
+            return
+        planner = explained.get("queryPlanner", {})
+        winning_plan = planner.get("winningPlan", {})
+        key = (f"{event.model.__module__}.{event.model.__qualname__}", shape_key(event.filter_shape))
+        with self._lock:
+            finding = self._findings.get(key)
+            if finding is None:
+                finding = self._findings[key] = Finding(event.model, event.filter_shape, filter_fields(event.filter))
+            finding.add(event.operation, classify_plan(winning_plan), plan_indexes(winning_plan),
+                        explained.get("executionStats", {}))
+
+    def explain(self, event: QueryEvent) -> Mapping[str, Any]:
+        """
+        Explain the query part of the operation. The writes and counts are explained as the `find` with the same
+        filter, the plan selection of the query is the same and the explain never runs the write.
+        """
+        command: Dict[str, Any] = {"find": event.collection.name, "filter": event.filter or {}}
+        if event.operation in ("find_one", "update_one", "delete_one"):
+            command["limit"] = 1
+        return event.collection.database.command({"explain": command, "verbosity": "executionStats"})
+
+    def findings(self) -> List[Finding]:
+        with self._lock:
+            return list(self._findings.values())
+
+    def problems(self) -> List[Finding]:
+        """The findings with a collection scan or examining too many documents per document returned."""
+        return [finding for finding in self.findings()
+                if finding.collscans or finding.examined_ratio > self.ratio_threshold]
+
+    def suggestions(self) -> List[IndexSuggestion]:
+        suggestions = []
+        for finding in self.problems():
+            suggestion = self.suggest(finding)
+            if suggestion is not None:
+                suggestions.append(suggestion)
+        return suggestions
+
+    def suggest(self, finding: Finding) -> Optional[IndexSuggestion]:
+        model = finding.model
+        indexed = indexed_fields(model)
+        candidates = [field for field in finding.fields if field not in indexed]
+        if not candidates:
+            return None
+        declared = [field for field in candidates if isinstance(model.__dict__.get(field), Field)]
+        reason = (f"{finding.collscans} of {finding.samples} sampled queries scanned the collection"
+                  if finding.collscans else
+                  f"{finding.examined_ratio:.0f} documents examined per document returned")
+        if len(finding.fields) > 1:
+            fields = ", ".join(f"`{field}`" for field in finding.fields)
+            message = f"create a compound index on {model.__name__} ({fields}) for the filter {finding.filter_shape}"
+            if declared:
+                message += f", or mark `{model.__name__}.{declared[0]}` index=True"
+        elif declared:
+            message = f"mark `{model.__name__}.{declared[0]}` index=True"
+        else:
+            message = f"create an index on `{model.__name__}.{candidates[0]}`"
+        return IndexSuggestion(finding, candidates, f"{message} ({reason})")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._findings.clear()
@@ -0,0 +1,26 @@
+from typing import Any
+
+from .base import Backend, PyMongoBackend
+
+# The memory backend imports pymongo, so it is only loaded when it is used
+_MEMORY_EXPORTS = ("MemoryBackend", "MemoryClient", "MemoryDatabase", "MemoryCollection", "MemoryCollectionView",
+                   "default_memory_backend")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MEMORY_EXPORTS:
+        from . import memory
+        return getattr(memory, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "Backend",
+    "PyMongoBackend",
+    "MemoryBackend",
+    "MemoryClient",
+    "MemoryDatabase",
+    "MemoryCollection",
+    "MemoryCollectionView",
+    "default_memory_backend"
+]
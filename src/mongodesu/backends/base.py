@@ -0,0 +1,31 @@
+from typing import Any, Union
+
+
+class Backend:
+    """
+    Base class for the storage backends used by the `MongoAPI`.
+    A backend is responsible for creating the client object, the client should expose the
+    same api as the `pymongo.MongoClient` (`get_database`, `close`) and the databases and collections
+    returned from it should expose the pymongo api used by the `Model`.
+    """
+
+    def create_client(self,
+                      host: Union[str, None] = None,
+                      port: Union[int, None] = 27017,
+                      uri: Union[str, None] = None) -> Any:
+        raise NotImplementedError("Subclasses must implement the create_client method.")
+
+
+class PyMongoBackend(Backend):
+    """The default backend, connects to a real mongodb server through `pymongo.MongoClient`.
+    """
+
+    def create_client(self,
+                      host: Union[str, None] = None,
+                      port: Union[int, None] = 27017,
+                      uri: Union[str, None] = None) -> Any:
+        from pymongo import MongoClient
+
+        if host:
+            return MongoClient(host=host, port=port)
+        return MongoClient(host=uri)
@@ -0,0 +1,1281 @@
+"""
+In-memory implementation of the pymongo client, database and collection api used by the `Model`.
+
+It is meant for the unit tests and benchmarks which should run without a mongodb server.
+The query language supported is the common subset used through the `Model`:
+
+- Comparison: `$eq`, `$ne`, `$gt`, `$gte`, `$lt`, `$lte`, `$in`, `$nin`
+- Element and evaluation: `$exists`, `$regex` (with `$options`), `$size`, `$all`, `$elemMatch`, `$not`
+- Logical: `$and`, `$or`, `$nor`
+- Update: `$set`, `$unset`, `$inc`, `$push` (with `$each`), `$addToSet`, `$pull`, `$setOnInsert`
+- Aggregation: `$match`, `$project`, `$sort`, `$skip`, `$limit`, `$count`, `$unwind`, `$group`
+- Validators: `$jsonSchema` with `bsonType`, `required`, `properties`, `enum`, `minLength`, `maxLength`, `minimum`,
+  `maximum`, `items`, `minItems`, `maxItems`
+"""
+import copy
+import datetime
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from bson.regex import Regex
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, WriteError
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from mongodesu.backends.base import Backend
+from mongodesu.routing.merge import bson_type_rank, get_values, normalize_sort, sort_documents, sort_key
+
+_MISSING = object()
+DEFAULT_DATABASE = "test"
+# Number of the change events kept per watched collection to resume the change streams from
+CHANGE_HISTORY_SIZE = 10000
+
+
+## Query matching
+
+def _type_rank(value: Any) -> int:
+    return bson_type_rank(None if value is _MISSING else value)
+
+
+def _compare(left: Any, right: Any) -> Optional[int]:
+    """Compare two values of the same bson type, returns None if they are not comparable."""
+    if _type_rank(left) != _type_rank(right):
+        return None
+    try:
+        if left < right:
+            return -1
+        if left > right:
+            return 1
+        return 0
+    except TypeError:
+        return 0 if left == right else None
+
+
+def _equals(candidate: Any, expected: Any) -> bool:
+    if isinstance(candidate, bool) != isinstance(expected, bool):
+        return False
+    return candidate == expected
+
+
+def _candidates(values: List[Any]) -> Iterator[Any]:
+    """The values and, for array values, the array items which a scalar condition is tested against."""
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _as_regex(pattern: Any, options: str = "") -> "re.Pattern[str]":
+    if isinstance(pattern, Regex):
+        return pattern.try_compile()
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option in options:
+        flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}.get(option, 0)
+    return re.compile(pattern, flags)
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, Mapping) and len(value) > 0 and all(str(key).startswith("$") for key in value)
+
+
+def _is_plain_key(value: Any) -> bool:
+    """If the value is matched by the equality of its hash, not a regex, an operator dict or an unhashable value."""
+    if isinstance(value, (Mapping, list, re.Pattern, Regex)):
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _match_equality(values: List[Any], expected: Any) -> bool:
+    if isinstance(expected, (re.Pattern, Regex)):
+        regex = _as_regex(expected)
+        return any(isinstance(item, str) and regex.search(item) for item in _candidates(values))
+    if expected is None and not values:
+        return True
+    return any(_equals(item, expected) for item in _candidates(values))
+
+
+def _match_operator(values: List[Any], operator: str, operand: Any, condition: Mapping[str, Any]) -> bool:
+    if operator == "$eq":
+        return _match_equality(values, operand)
+    if operator == "$ne":
+        return not _match_equality(values, operand)
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        for item in _candidates(values):
+            result = _compare(item, operand)
+            if result is None:
+                continue
+            if ((operator == "$gt" and result > 0) or (operator == "$gte" and result >= 0)
+                    or (operator == "$lt" and result < 0) or (operator == "$lte" and result <= 0)):
+                return True
+        return False
+    if operator == "$in":
+        return any(_match_equality(values, expected) for expected in operand)
+    if operator == "$nin":
+        return not any(_match_equality(values, expected) for expected in operand)
+    if operator == "$exists":
+        return bool(values) == bool(operand)
+    if operator == "$regex":
+        regex = _as_regex(operand, condition.get("$options", ""))
+        return any(isinstance(item, str) and regex.search(item) for item in _candidates(values))
+    if operator == "$options":
+        return True
+    if operator == "$size":
+        return any(isinstance(item, list) and len(item) == operand for item in values)
+    if operator == "$all":
+        return any(isinstance(item, list) and all(_match_equality([item], expected) for expected in operand)
+                   for item in values)
+    if operator == "$elemMatch":
+        for item in values:
+            if not isinstance(item, list):
+                continue
+            for element in item:
+                if _is_operator_dict(operand):
+                    if _match_condition([element], operand):
+                        return True
+                elif isinstance(element, Mapping) and match(element, operand):
+                    return True
+        return False
+    if operator == "$not":
+        if _is_operator_dict(operand):
+            return not _match_condition(values, operand)
+        return not _match_equality(values, operand)
+    raise OperationFailure(f"unknown operator: {operator}")
+
+
+def _match_condition(values: List[Any], condition: Any) -> bool:
+    if _is_operator_dict(condition):
+        return all(_match_operator(values, operator, operand, condition) for operator, operand in condition.items())
+    return _match_equality(values, condition)
+
+
+def match(doc: Mapping[str, Any], query: Optional[Mapping[str, Any]]) -> bool:
+    """Check if the document matches the mongodb query filter."""
+    if not query:
+        return True
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(match(doc, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(match(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(match(doc, sub) for sub in condition):
+                return False
+        elif key.startswith("$"):
+            raise OperationFailure(f"unknown top level operator: {key}")
+        elif not _match_condition(get_values(doc, key), condition):
+            return False
+    return True
+
+
+## Schema validation
+
+def bson_type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int" if -2 ** 31 <= value < 2 ** 31 else "long"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, Mapping):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, ObjectId):
+        return "objectId"
+    if isinstance(value, datetime.datetime):
+        return "date"
+    if isinstance(value, Decimal128):
+        return "decimal"
+    if isinstance(value, bytes):
+        return "binData"
+    if isinstance(value, (re.Pattern, Regex)):
+        return "regex"
+    return type(value).__name__
+
+
+def schema_valid(value: Any, schema: Mapping[str, Any]) -> bool:
+    """Check the value against the supported subset of the `$jsonSchema` keywords."""
+    if "bsonType" in schema:
+        expected = schema["bsonType"]
+        expected = [expected] if isinstance(expected, str) else list(expected)
+        if "number" in expected:
+            expected.extend(["int", "long", "double", "decimal"])
+        if bson_type_name(value) not in expected:
+            return False
+    if "enum" in schema and not any(_equals(value, item) for item in schema["enum"]):
+        return False
+    if isinstance(value, str):
+        if len(value) < schema.get("minLength", 0) or len(value) > schema.get("maxLength", len(value)):
+            return False
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            return False
+        if "maximum" in schema and value > schema["maximum"]:
+            return False
+    if isinstance(value, list):
+        if len(value) < schema.get("minItems", 0) or len(value) > schema.get("maxItems", len(value)):
+            return False
+        if "items" in schema and not all(schema_valid(item, schema["items"]) for item in value):
+            return False
+    if isinstance(value, Mapping):
+        if any(key not in value for key in schema.get("required", [])):
+            return False
+        for key, property_schema in schema.get("properties", {}).items():
+            if key in value and not schema_valid(value[key], property_schema):
+                return False
+    return True
+
+
+def validator_valid(doc: Mapping[str, Any], validator: Mapping[str, Any]) -> bool:
+    query = {key: value for key, value in validator.items() if key != "$jsonSchema"}
+    if "$jsonSchema" in validator and not schema_valid(doc, validator["$jsonSchema"]):
+        return False
+    return match(doc, query)
+
+
+## Projection
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    target: Any = doc
+    for part in parts[:-1]:
+        if isinstance(target, list):
+            target = target[int(part)]
+            continue
+        if not isinstance(target.get(part), (dict, list)):
+            target[part] = {}
+        target = target[part]
+    if isinstance(target, list):
+        target[int(parts[-1])] = value
+    else:
+        target[parts[-1]] = value
+
+
+def _get_path(doc: Mapping[str, Any], path: str, default: Any = _MISSING) -> Any:
+    target: Any = doc
+    for part in path.split("."):
+        if isinstance(target, Mapping) and part in target:
+            target = target[part]
+        elif isinstance(target, list) and part.isdigit() and int(part) < len(target):
+            target = target[int(part)]
+        else:
+            return default
+    return target
+
+
+def _unset_path(doc: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    parent = _get_path(doc, ".".join(parts[:-1])) if len(parts) > 1 else doc
+    if isinstance(parent, dict):
+        parent.pop(parts[-1], None)
+
+
+def project(doc: Dict[str, Any], projection: Optional[Union[Mapping[str, Any], List[str]]]) -> Dict[str, Any]:
+    if not projection:
+        return doc
+    if not isinstance(projection, Mapping):
+        projection = {key: 1 for key in projection}
+    include_id = bool(projection.get("_id", True))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(not value for value in fields.values()):
+        result = copy.deepcopy(doc)
+        for key in fields:
+            _unset_path(result, key)
+        if not include_id:
+            result.pop("_id", None)
+        return result
+    result: Dict[str, Any] = {}
+    if include_id and "_id" in doc:
+        result["_id"] = doc["_id"]
+    for key in fields:
+        value = _get_path(doc, key)
+        if value is not _MISSING:
+            _set_path(result, key, copy.deepcopy(value))
+    return result
+
+
+## Updates
+
+def _is_update_document(update: Mapping[str, Any]) -> bool:
+    return bool(update) and all(str(key).startswith("$") for key in update)
+
+
+def apply_update(doc: Dict[str, Any], update: Mapping[str, Any], inserting: bool = False) -> None:
+    for operator, fields in update.items():
+        if operator == "$setOnInsert":
+            if not inserting:
+                continue
+            operator = "$set"
+        for path, value in fields.items():
+            if operator == "$set":
+                _set_path(doc, path, copy.deepcopy(value))
+            elif operator == "$unset":
+                _unset_path(doc, path)
+            elif operator == "$inc":
+                current = _get_path(doc, path, 0)
+                if not isinstance(current, (int, float)) or isinstance(current, bool):
+                    raise OperationFailure(f"Cannot apply $inc to a value of non-numeric type for {path}")
+                _set_path(doc, path, current + value)
+            elif operator in ("$push", "$addToSet"):
+                current = _get_path(doc, path, None)
+                if current is None:
+                    current = []
+                    _set_path(doc, path, current)
+                if not isinstance(current, list):
+                    raise OperationFailure(f"The field '{path}' must be an array")
+                items = value["$each"] if isinstance(value, Mapping) and "$each" in value else [value]
+                for item in items:
+                    if operator == "$push" or item not in current:
+                        current.append(copy.deepcopy(item))
+            elif operator == "$pull":
+                current = _get_path(doc, path, None)
+                if isinstance(current, list):
+                    current[:] = [item for item in current if not _match_condition([item], value)]
+            else:
+                raise OperationFailure(f"Unknown modifier: {operator}")
+
+
+def _upsert_seed(query: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """The equality parts of the filter which becomes the base of the upserted document."""
+    seed: Dict[str, Any] = {}
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            for sub in condition:
+                seed.update(_upsert_seed(sub))
+        elif key.startswith("$"):
+            continue
+        elif _is_operator_dict(condition):
+            if "$eq" in condition:
+                _set_path(seed, key, copy.deepcopy(condition["$eq"]))
+        else:
+            _set_path(seed, key, copy.deepcopy(condition))
+    return seed
+
+
+## Aggregation
+
+def _evaluate(doc: Mapping[str, Any], expression: Any) -> Any:
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get_path(doc, expression[1:], None)
+        return value
+    if isinstance(expression, Mapping):
+        return {key: _evaluate(doc, value) for key, value in expression.items()}
+    return expression
+
+
+def _group(docs: List[Dict[str, Any]], spec: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    groups: Dict[Any, Dict[str, Any]] = {}
+    values: Dict[Any, Dict[str, List[Any]]] = {}
+    for doc in docs:
+        group_id = _evaluate(doc, spec["_id"])
+        key = repr(group_id)
+        if key not in groups:
+            groups[key] = {"_id": group_id}
+            values[key] = {field: [] for field in spec if field != "_id"}
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (operator, expression), = accumulator.items()
+            values[key][field].append(1 if operator == "$count" else _evaluate(doc, expression))
+    results = []
+    for key, group in groups.items():
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            operator = next(iter(accumulator))
+            items = values[key][field]
+            numbers = [item for item in items if isinstance(item, (int, float)) and not isinstance(item, bool)]
+            if operator in ("$sum", "$count"):
+                group[field] = sum(numbers)
+            elif operator == "$avg":
+                group[field] = sum(numbers) / len(numbers) if numbers else None
+            elif operator == "$min":
+                group[field] = min(items, key=sort_key) if items else None
+            elif operator == "$max":
+                group[field] = max(items, key=sort_key) if items else None
+            elif operator == "$push":
+                group[field] = items
+            elif operator == "$addToSet":
+                group[field] = [item for index, item in enumerate(items) if item not in items[:index]]
+            elif operator == "$first":
+                group[field] = items[0] if items else None
+            elif operator == "$last":
+                group[field] = items[-1] if items else None
+            else:
+                raise OperationFailure(f"unknown group operator '{operator}'")
+        results.append(group)
+    return results
+
+
+def run_pipeline(docs: List[Dict[str, Any]], pipeline: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [doc for doc in docs if match(doc, spec)]
+        elif name == "$project":
+            docs = [project(doc, spec) for doc in docs]
+        elif name == "$sort":
+            docs = sort_documents(docs, normalize_sort(spec))
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$unwind":
+            path = spec if isinstance(spec, str) else spec["path"]
+            path = path[1:]
+            unwound = []
+            for doc in docs:
+                items = _get_path(doc, path, None)
+                if not isinstance(items, list):
+                    if items is not None:
+                        unwound.append(doc)
+                    continue
+                for item in items:
+                    copied = copy.deepcopy(doc)
+                    _set_path(copied, path, item)
+                    unwound.append(copied)
+            docs = unwound
+        elif name == "$group":
+            docs = _group(docs, spec)
+        else:
+            raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'")
+    return docs
+
+
+## Cursors
+
+class MemoryCommandCursor:
+    """Iterable over a materialized list of result documents."""
+
+    def __init__(self, documents: List[Dict[str, Any]]) -> None:
+        self._documents = documents
+        self._iterator = iter(documents)
+        self.alive = True
+
+    def __iter__(self) -> "MemoryCommandCursor":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self.alive = False
+            raise
+
+    next = __next__
+
+    def try_next(self) -> Optional[Dict[str, Any]]:
+        try:
+            return next(self)
+        except StopIteration:
+            return None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def close(self) -> None:
+        self.alive = False
+
+    def __enter__(self) -> "MemoryCommandCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class MemoryCursor:
+    """A lazy cursor over the documents of a `MemoryCollection`, evaluated on the first iteration."""
+
+    def __init__(self,
+                 collection: "MemoryCollection",
+                 filter: Optional[Mapping[str, Any]] = None,
+                 projection: Optional[Union[Mapping[str, Any], List[str]]] = None,
+                 skip: int = 0,
+                 limit: int = 0,
+                 sort: Any = None,
+                 batch_size: int = 0,
+                 **kwargs: Any) -> None:
+        self.collection = collection
+        self._filter = filter
+        self._projection = projection
+        self._skip = skip
+        self._limit = limit
+        self._sort = normalize_sort(sort)
+        self._batch_size = batch_size
+        self._iterator: Optional[Iterator[Dict[str, Any]]] = None
+
+    def _check_not_started(self) -> None:
+        if self._iterator is not None:
+            raise OperationFailure("cannot set options after executing query")
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "MemoryCursor":
+        self._check_not_started()
+        self._sort = normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "MemoryCursor":
+        self._check_not_started()
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self._check_not_started()
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> "MemoryCursor":
+        self._batch_size = batch_size
+        return self
+
+    def _execute(self) -> List[Dict[str, Any]]:
+        docs = self.collection._select(self._filter)
+        if self._sort:
+            docs = sort_documents(docs, self._sort)
+        if self._skip:
+            docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:abs(self._limit)]
+        return [project(doc, self._projection) for doc in docs]
+
+    def __iter__(self) -> "MemoryCursor":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._iterator is None:
+            self._iterator = iter(self._execute())
+        return next(self._iterator)
+
+    next = __next__
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def close(self) -> None:
+        self._iterator = iter(())
+
+    def __enter__(self) -> "MemoryCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class MemoryChangeStream:
+    """
+    Change stream over the change history of a `MemoryCollection`, the stand-in for
+    `pymongo.change_stream.CollectionChangeStream`. The `$match` and `$project` stages of the pipeline are applied.
+    """
+
+    def __init__(self,
+                 collection: "MemoryCollection",
+                 pipeline: Optional[List[Mapping[str, Any]]] = None,
+                 full_document: Optional[str] = None,
+                 resume_after: Optional[Mapping[str, Any]] = None,
+                 max_await_time_ms: Optional[int] = None,
+                 start_after: Optional[Mapping[str, Any]] = None,
+                 **kwargs: Any) -> None:
+        self.collection = collection
+        self._pipeline = list(pipeline or [])
+        self._full_document = full_document
+        self._max_await = (max_await_time_ms or 0) / 1000
+        self._alive = True
+        token = resume_after or start_after
+        with collection._lock:
+            if token is None:
+                self._position = collection._change_sequence
+            else:
+                self._position = int(token["_data"], 16)
+                oldest = collection._changes[0]["_id"] if collection._changes else None
+                if self._position < collection._change_sequence and (
+                        oldest is None or int(oldest["_data"], 16) > self._position + 1):
+                    raise OperationFailure("Resume of change stream was not possible, as the resume point may no "
+                                           "longer be in the oplog.", 286)
+        self._resume_token = token
+
+    @property
+    def alive(self) -> bool:
+        return self._alive
+
+    @property
+    def resume_token(self) -> Optional[Mapping[str, Any]]:
+        return self._resume_token
+
+    def _next_change(self) -> Optional[Dict[str, Any]]:
+        collection = self.collection
+        with collection._lock:
+            for change in collection._changes:
+                sequence = int(change["_id"]["_data"], 16)
+                if sequence <= self._position:
+                    continue
+                self._position = sequence
+                self._resume_token = change["_id"]
+                change = copy.deepcopy(change)
+                if change["operationType"] == "update" and self._full_document not in ("updateLookup", "whenAvailable",
+                                                                                        "required"):
+                    change.pop("fullDocument", None)
+                results = run_pipeline([change], self._pipeline)
+                if results:
+                    return results[0]
+        return None
+
+    def try_next(self) -> Optional[Dict[str, Any]]:
+        if not self._alive:
+            raise StopIteration
+        change = self._next_change()
+        if change is None and self._max_await:
+            deadline = time.monotonic() + self._max_await
+            with self.collection._changed:
+                while change is None and self._alive:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.collection._changed.wait(remaining)
+                    change = self._next_change()
+        return change
+
+    def __iter__(self) -> "MemoryChangeStream":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        while self._alive:
+            change = self.try_next()
+            if change is not None:
+                return change
+            if not self._max_await:
+                with self.collection._changed:
+                    self.collection._changed.wait(0.05)
+        raise StopIteration
+
+    next = __next__
+
+    def close(self) -> None:
+        self._alive = False
+        with self.collection._changed:
+            self.collection._changed.notify_all()
+
+    def __enter__(self) -> "MemoryChangeStream":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+## Client, database, collection
+
+def _index_keys(keys: Any) -> List[Tuple[str, Any]]:
+    if isinstance(keys, str):
+        return [(keys, 1)]
+    if isinstance(keys, Mapping):
+        return list(keys.items())
+    return [(key, 1) if isinstance(key, str) else (key[0], key[1]) for key in keys]
+
+
+class MemoryCollection:
+    """In-memory stand-in for `pymongo.collection.Collection`. All the operations are thread safe."""
+
+    def __init__(self, database: "MemoryDatabase", name: str) -> None:
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._documents: Dict[Any, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", 1)], "unique": True}}
+        self.options: Dict[str, Any] = {}
+        # Listed by the database, unset once dropped until it is written to or looked up again
+        self.exists = True
+        # Only recorded, there is a single member to read from and write to
+        self.read_preference: Any = None
+        self.read_concern: Any = None
+        self.write_concern: Any = None
+        # The change history is only recorded once the collection is watched
+        self._watched = False
+        self._changes: "deque[Dict[str, Any]]" = deque(maxlen=CHANGE_HISTORY_SIZE)
+        self._change_sequence = 0
+
+    def __repr__(self) -> str:
+        return f"MemoryCollection({self.database!r}, {self.name!r})"
+
+    def _create(self) -> None:
+        if not self.exists:
+            self.exists = True
+            self.database._create()
+
+    def _clear(self) -> None:
+        """Drops the documents, indexes and options. The collection object is kept, so the handles held
+        by the models keep working after the collection is dropped, like the pymongo handles."""
+        with self._lock:
+            self._documents.clear()
+            self._indexes = {"_id_": {"key": [("_id", 1)], "unique": True}}
+            self.options.clear()
+            self.exists = False
+
+    def with_options(self, **kwargs: Any) -> "MemoryCollectionView":
+        """A handle of the same collection with the read preference, read concern and write concern set."""
+        return MemoryCollectionView(self, **kwargs)
+
+    ## Indexes
+
+    def create_index(self, keys: Any, **kwargs: Any) -> str:
+        key = _index_keys(keys)
+        name = kwargs.get("name") or "_".join(f"{field}_{direction}" for field, direction in key)
+        with self._lock:
+            self._create()
+            existing = self._indexes.get(name)
+            if existing is not None:
+                if existing["key"] != key or bool(existing.get("unique")) != bool(kwargs.get("unique")):
+                    raise OperationFailure(f"An existing index has the same name as the requested index: {name}")
+                return name
+            index: Dict[str, Any] = {"key": key, "unique": bool(kwargs.get("unique", False))}
+            if index["unique"]:
+                entries: Dict[Tuple[Any, ...], Any] = {}
+                for doc in self._documents.values():
+                    value = self._unique_value(doc, key)
+                    if value in entries:
+                        raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {name}",
+                                                11000)
+                    entries[value] = doc["_id"]
+                    self._mark_multikey(index, doc)
+                index["entries"] = entries
+            self._indexes[name] = index
+        return name
+
+    def create_indexes(self, indexes: Iterable[Any], **kwargs: Any) -> List[str]:
+        return [self.create_index(index.document["key"], **{key: value for key, value in index.document.items()
+                                                              if key != "key"}) for index in indexes]
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: {key: copy.deepcopy(value) for key, value in index.items() if key != "entries"}
+                    for name, index in self._indexes.items()}
+
+    def list_indexes(self) -> MemoryCommandCursor:
+        return MemoryCommandCursor([{"name": name, **index} for name, index in self.index_information().items()])
+
+    def drop_index(self, index_or_name: Any) -> None:
+        name = index_or_name if isinstance(index_or_name, str) else "_".join(
+            f"{field}_{direction}" for field, direction in _index_keys(index_or_name))
+        if name == "_id_":
+            raise OperationFailure("cannot drop _id index")
+        with self._lock:
+            if self._indexes.pop(name, None) is None:
+                raise OperationFailure(f"index not found with name [{name}]")
+
+    def drop_indexes(self) -> None:
+        with self._lock:
+            self._indexes = {"_id_": self._indexes["_id_"]}
+
+    @staticmethod
+    def _unique_value(doc: Mapping[str, Any], key: List[Tuple[str, Any]]) -> Tuple[Any, ...]:
+        return tuple(repr(_get_path(doc, field, None)) for field, _ in key)
+
+    def _unique_indexes(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return ((name, index) for name, index in self._indexes.items() if index.get("unique") and name != "_id_")
+
+    def _check_unique(self, doc: Mapping[str, Any], ignore_id: Any = _MISSING) -> None:
+        for name, index in self._unique_indexes():
+            value = self._unique_value(doc, index["key"])
+            owner = index["entries"].get(value, _MISSING)
+            if owner is not _MISSING and owner != ignore_id:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {name} dup key: {value}",
+                    11000, {"keyValue": {field: _get_path(doc, field, None) for field, _ in index["key"]}})
+
+    def _index_add(self, doc: Mapping[str, Any]) -> None:
+        for _, index in self._unique_indexes():
+            index["entries"][self._unique_value(doc, index["key"])] = doc["_id"]
+            self._mark_multikey(index, doc)
+
+    @staticmethod
+    def _mark_multikey(index: Dict[str, Any], doc: Mapping[str, Any]) -> None:
+        # The entries are keyed by the whole array, an equality on one of its items can not be looked up
+        if not index.get("multikey") and any(isinstance(_get_path(doc, field, None), list) for field, _ in index["key"]):
+            index["multikey"] = True
+
+    def _index_remove(self, doc: Mapping[str, Any]) -> None:
+        for _, index in self._unique_indexes():
+            index["entries"].pop(self._unique_value(doc, index["key"]), None)
+
+    ## Validation
+
+    def _validate(self, doc: Mapping[str, Any], previous: Optional[Mapping[str, Any]] = None) -> None:
+        validator = self.options.get("validator")
+        if not validator:
+            return
+        if (self.options.get("validationLevel") == "moderate" and previous is not None
+                and not validator_valid(previous, validator)):
+            return
+        if validator_valid(doc, validator):
+            return
+        if self.options.get("validationAction") == "warn":
+            logging.getLogger("mongodesu.backends.memory").warning(
+                "Document failed validation in %s: %r", self.full_name, doc.get("_id"))
+            return
+        raise WriteError("Document failed validation", 121, {"index": 0, "code": 121,
+                                                             "errmsg": "Document failed validation",
+                                                             "errInfo": {"failingDocumentId": doc.get("_id")}})
+
+    ## Change streams
+
+    def _record_change(self, operation_type: str, _id: Any, document: Optional[Dict[str, Any]] = None,
+                       previous: Optional[Dict[str, Any]] = None) -> None:
+        if not self._watched:
+            return
+        self._change_sequence += 1
+        change: Dict[str, Any] = {
+            "_id": {"_data": f"{self._change_sequence:016x}"},
+            "operationType": operation_type,
+            "wallTime": datetime.datetime.now(datetime.timezone.utc),
+            "ns": {"db": self.database.name, "coll": self.name},
+            "documentKey": {"_id": _id},
+        }
+        if document is not None:
+            change["fullDocument"] = copy.deepcopy(document)
+        if operation_type == "update" and previous is not None and document is not None:
+            change["updateDescription"] = {
+                "updatedFields": {key: copy.deepcopy(value) for key, value in document.items()
+                                  if key not in previous or previous[key] != value},
+                "removedFields": [key for key in previous if key not in document],
+            }
+        self._changes.append(change)
+        self._changed.notify_all()
+
+    def watch(self, pipeline: Optional[List[Mapping[str, Any]]] = None, full_document: Optional[str] = None,
+              resume_after: Optional[Mapping[str, Any]] = None, max_await_time_ms: Optional[int] = None,
+              batch_size: Optional[int] = None, **kwargs: Any) -> MemoryChangeStream:
+        with self._lock:
+            self._watched = True
+            return MemoryChangeStream(self, pipeline, full_document, resume_after, max_await_time_ms, **kwargs)
+
+    ## Reads
+
+    def _candidates(self, filter: Optional[Mapping[str, Any]]) -> List[Tuple[Any, Dict[str, Any]]]:
+        """The documents which may match the filter, looked up by `_id` or a single field unique index when the
+        filter has an equality on a string or `ObjectId`, otherwise all the documents. Must be called with the lock held."""
+        if filter:
+            if "_id" in filter and _is_plain_key(filter["_id"]):
+                doc = self._documents.get(filter["_id"])
+                return [(filter["_id"], doc)] if doc is not None else []
+            for _, index in self._unique_indexes():
+                field = index["key"][0][0]
+                if (len(index["key"]) == 1 and field in filter and not index.get("multikey")
+                        and isinstance(filter[field], (str, ObjectId))):
+                    _id = index["entries"].get((repr(filter[field]),), _MISSING)
+                    return [(_id, self._documents[_id])] if _id is not _MISSING else []
+        return list(self._documents.items())
+
+    def _select(self, filter: Optional[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [copy.deepcopy(doc) for _, doc in self._candidates(filter) if match(doc, filter)]
+
+    def find(self, *args: Any, **kwargs: Any) -> MemoryCursor:
+        return MemoryCursor(self, *args, **kwargs)
+
+    def find_one(self, filter: Optional[Any] = None, *args: Any, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        if filter is not None and not isinstance(filter, Mapping):
+            filter = {"_id": filter}
+        kwargs["limit"] = 1
+        for doc in self.find(filter, *args, **kwargs):
+            return doc
+        return None
+
+    def count_documents(self, filter: Mapping[str, Any], session: Any = None, comment: Any = None,
+                        **kwargs: Any) -> int:
+        docs = self._select(filter)
+        skip = kwargs.get("skip", 0)
+        limit = kwargs.get("limit", 0)
+        docs = docs[skip:]
+        if limit:
+            docs = docs[:limit]
+        return len(docs)
+
+    def estimated_document_count(self, **kwargs: Any) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def distinct(self, key: str, filter: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> List[Any]:
+        distinct: List[Any] = []
+        for doc in self._select(filter):
+            for value in _candidates(get_values(doc, key)):
+                if not isinstance(value, list) and value not in distinct:
+                    distinct.append(value)
+        return distinct
+
+    def aggregate(self, pipeline: Iterable[Mapping[str, Any]], session: Any = None, let: Any = None,
+                  comment: Any = None, **kwargs: Any) -> MemoryCommandCursor:
+        return MemoryCommandCursor(run_pipeline(self._select(None), list(pipeline)))
+
+    ## Writes
+
+    def _insert(self, document: Any, validate: bool = True) -> Any:
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        stored = copy.deepcopy(dict(document))
+        if validate:
+            self._validate(stored)
+        self._create()
+        if stored["_id"] in self._documents:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.full_name} index: _id_ dup key: {stored['_id']}",
+                11000, {"keyValue": {"_id": stored["_id"]}})
+        self._check_unique(stored)
+        self._documents[stored["_id"]] = stored
+        self._index_add(stored)
+        self._record_change("insert", stored["_id"], stored)
+        return stored["_id"]
+
+    def insert_one(self, document: Any, bypass_document_validation: bool = False, session: Any = None,
+                   comment: Any = None) -> InsertOneResult:
+        with self._lock:
+            return InsertOneResult(self._insert(document, not bypass_document_validation), True)
+
+    def insert_many(self, documents: Iterable[Any], ordered: bool = True, bypass_document_validation: bool = False,
+                    session: Any = None, comment: Any = None) -> InsertManyResult:
+        inserted_ids: List[Any] = []
+        errors: List[Dict[str, Any]] = []
+        with self._lock:
+            for index, document in enumerate(documents):
+                try:
+                    inserted_ids.append(self._insert(document, not bypass_document_validation))
+                except WriteError as error:
+                    errors.append({"index": index, "code": error.code, "errmsg": str(error), "op": document})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted_ids),
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return InsertManyResult(inserted_ids, True)
+
+    def _update(self, filter: Mapping[str, Any], update: Mapping[str, Any], upsert: bool, multi: bool,
+                replace: bool = False, validate: bool = True) -> UpdateResult:
+        if not isinstance(update, Mapping):
+            raise NotImplementedError("Pipeline updates are not supported by the memory backend.")
+        if replace == _is_update_document(update):
+            raise ValueError("update only works with $ operators" if not replace
+                             else "replacement can not include $ operators")
+        with self._lock:
+            matched = 0
+            modified = 0
+            for _id, doc in self._candidates(filter):
+                if not match(doc, filter):
+                    continue
+                matched += 1
+                updated = copy.deepcopy(doc)
+                if replace:
+                    updated = {"_id": _id, **copy.deepcopy(dict(update))}
+                else:
+                    apply_update(updated, update)
+                if updated.get("_id") != _id:
+                    raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'")
+                if updated != doc:
+                    if validate:
+                        self._validate(updated, doc)
+                    self._check_unique(updated, ignore_id=_id)
+                    self._index_remove(doc)
+                    self._documents[_id] = updated
+                    self._index_add(updated)
+                    self._record_change("replace" if replace else "update", _id, updated, doc)
+                    modified += 1
+                if not multi:
+                    break
+            if matched == 0 and upsert:
+                seed = _upsert_seed(filter)
+                if replace:
+                    seed = {key: value for key, value in seed.items() if key == "_id"}
+                    seed.update(copy.deepcopy(dict(update)))
+                else:
+                    apply_update(seed, update, inserting=True)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": self._insert(seed, validate)}, True)
+            return UpdateResult({"n": matched, "nModified": modified}, True)
+
+    def update_one(self, filter: Mapping[str, Any], update: Mapping[str, Any], upsert: bool = False,
+                   bypass_document_validation: bool = False, collation: Any = None, array_filters: Any = None,
+                   hint: Any = None, session: Any = None, let: Any = None, comment: Any = None) -> UpdateResult:
+        return self._update(filter, update, upsert, multi=False, validate=not bypass_document_validation)
+
+    def update_many(self, filter: Mapping[str, Any], update: Mapping[str, Any], upsert: bool = False,
+                    array_filters: Any = None, bypass_document_validation: Optional[bool] = None,
+                    collation: Any = None, hint: Any = None, session: Any = None, let: Any = None,
+                    comment: Any = None) -> UpdateResult:
+        return self._update(filter, update, upsert, multi=True, validate=not bypass_document_validation)
+
+    def replace_one(self, filter: Mapping[str, Any], replacement: Mapping[str, Any], upsert: bool = False,
+                    **kwargs: Any) -> UpdateResult:
+        return self._update(filter, replacement, upsert, multi=False, replace=True,
+                            validate=not kwargs.get("bypass_document_validation"))
+
+    def _delete(self, filter: Mapping[str, Any], multi: bool) -> DeleteResult:
+        with self._lock:
+            deleted = 0
+            for _id, doc in self._candidates(filter):
+                if match(doc, filter):
+                    del self._documents[_id]
+                    self._index_remove(doc)
+                    self._record_change("delete", _id)
+                    deleted += 1
+                    if not multi:
+                        break
+        return DeleteResult({"n": deleted}, True)
+
+    def delete_one(self, filter: Mapping[str, Any], collation: Any = None, hint: Any = None, session: Any = None,
+                   let: Any = None, comment: Any = None) -> DeleteResult:
+        return self._delete(filter, multi=False)
+
+    def delete_many(self, filter: Mapping[str, Any], collation: Any = None, hint: Any = None, session: Any = None,
+                    let: Any = None, comment: Any = None) -> DeleteResult:
+        return self._delete(filter, multi=True)
+
+    def drop(self, **kwargs: Any) -> None:
+        self.database.drop_collection(self.name)
+
+    def explain_find(self, filter: Optional[Mapping[str, Any]] = None, limit: int = 0) -> Dict[str, Any]:
+        """
+        Simulates the `explain` of a find. An index is considered usable if its first key is tested by the filter
+        with an equality, in that case only the documents matching that key are examined.
+        """
+        filter = filter or {}
+        with self._lock:
+            total = len(self._documents)
+            candidates = None
+            for name, index in self._indexes.items():
+                first_key = index["key"][0][0]
+                if first_key in filter and not _is_operator_dict(filter[first_key]):
+                    candidates = (name, index)
+                    break
+            if candidates is None:
+                examined = total
+                input_stage: Dict[str, Any] = {"stage": "COLLSCAN", "direction": "forward"}
+                keys_examined = 0
+            else:
+                name, index = candidates
+                first_key = index["key"][0][0]
+                examined = sum(1 for doc in self._documents.values() if match(doc, {first_key: filter[first_key]}))
+                input_stage = {"stage": "IXSCAN", "indexName": name, "keyPattern": dict(index["key"])}
+                keys_examined = examined
+            returned = sum(1 for doc in self._documents.values() if match(doc, filter))
+        if limit:
+            returned = min(returned, abs(limit))
+        winning_plan = input_stage if input_stage["stage"] == "COLLSCAN" else {"stage": "FETCH", "inputStage": input_stage}
+        return {
+            "queryPlanner": {"namespace": self.full_name, "parsedQuery": filter, "winningPlan": winning_plan,
+                             "rejectedPlans": []},
+            "executionStats": {"nReturned": returned, "totalDocsExamined": examined,
+                               "totalKeysExamined": keys_examined, "executionTimeMillis": 0},
+            "ok": 1.0,
+        }
+
+
+class MemoryCollectionView:
+    """A `MemoryCollection` with other options, like the collections returned from `Collection.with_options`.
+    The collection is looked up by name, so the view keeps working after the collection is dropped and recreated."""
+
+    def __init__(self, collection: MemoryCollection, codec_options: Any = None, read_preference: Any = None,
+                 write_concern: Any = None, read_concern: Any = None) -> None:
+        self.database = collection.database
+        self.name = collection.name
+        self.codec_options = codec_options
+        self.read_preference = read_preference if read_preference is not None else collection.read_preference
+        self.write_concern = write_concern if write_concern is not None else collection.write_concern
+        self.read_concern = read_concern if read_concern is not None else collection.read_concern
+
+    @property
+    def _collection(self) -> MemoryCollection:
+        return self.database.get_collection(self.name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._collection, name)
+
+    def __repr__(self) -> str:
+        return f"MemoryCollectionView({self.database!r}, {self.name!r}, read_preference={self.read_preference!r})"
+
+    def with_options(self, **kwargs: Any) -> "MemoryCollectionView":
+        options = {"read_preference": self.read_preference, "write_concern": self.write_concern,
+                   "read_concern": self.read_concern}
+        options.update({key: value for key, value in kwargs.items() if value is not None})
+        return MemoryCollectionView(self._collection, **options)
+
+
+class MemoryDatabase:
+    """In-memory stand-in for `pymongo.database.Database`."""
+
+    def __init__(self, client: "MemoryClient", name: str) -> None:
+        self.client = client
+        self.name = name
+        self._lock = threading.RLock()
+        # The collections ever looked up, the dropped ones are kept with `exists` unset
+        self._collections: Dict[str, MemoryCollection] = {}
+        self.exists = True
+
+    def __repr__(self) -> str:
+        return f"MemoryDatabase({self.name!r})"
+
+    def _create(self) -> None:
+        self.exists = True
+
+    def _clear(self) -> None:
+        with self._lock:
+            for collection in self._collections.values():
+                collection._clear()
+            self.exists = False
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    def get_collection(self, name: str, **kwargs: Any) -> Union[MemoryCollection, MemoryCollectionView]:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = MemoryCollection(self, name)
+            else:
+                collection._create()
+            self._create()
+        if any(value is not None for value in kwargs.values()):
+            return collection.with_options(**kwargs)
+        return collection
+
+    def create_collection(self, name: str, **kwargs: Any) -> MemoryCollection:
+        with self._lock:
+            if name in self._collections and self._collections[name].exists:
+                raise OperationFailure(f"Collection {self.name}.{name} already exists", 48)
+            collection = self.get_collection(name)
+            collection.options.update({key: kwargs[key] for key in ("validator", "validationLevel", "validationAction")
+                                       if key in kwargs})
+            return collection
+
+    def list_collection_names(self, **kwargs: Any) -> List[str]:
+        with self._lock:
+            return [name for name, collection in self._collections.items() if collection.exists]
+
+    def drop_collection(self, name: str, **kwargs: Any) -> None:
+        with self._lock:
+            collection = self._collections.get(name)
+        if collection is not None:
+            collection._clear()
+
+    def command(self, command: Union[str, Mapping[str, Any]], value: Any = 1, **kwargs: Any) -> Dict[str, Any]:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        if name == "collMod":
+            collection_name = value if isinstance(command, str) else command[name]
+            options = kwargs if isinstance(command, str) else {**command, **kwargs}
+            with self._lock:
+                if collection_name not in self._collections or not self._collections[collection_name].exists:
+                    raise OperationFailure(f"ns does not exist: {self.name}.{collection_name}", 26)
+                collection = self._collections[collection_name]
+            collection.options.update({key: options[key] for key in ("validator", "validationLevel", "validationAction")
+                                       if key in options})
+            return {"ok": 1.0}
+        if name == "listCollections":
+            with self._lock:
+                batch = [{"name": collection_name, "type": "collection", "options": dict(collection.options)}
+                         for collection_name, collection in self._collections.items() if collection.exists]
+            return {"cursor": {"id": 0, "ns": f"{self.name}.$cmd.listCollections", "firstBatch": batch}, "ok": 1.0}
+        if name == "explain" and isinstance(command, Mapping):
+            explained = command["explain"]
+            if "find" in explained:
+                return self.get_collection(explained["find"]).explain_find(explained.get("filter"),
+                                                                           explained.get("limit", 0))
+        raise OperationFailure(f"no such command: '{name}' in the memory backend")
+
+
+class MemoryClient:
+    """In-memory stand-in for `pymongo.MongoClient`, all the clients of one `MemoryBackend` share the data."""
+
+    def __init__(self, backend: "MemoryBackend", default_database: Optional[str] = None) -> None:
+        self.backend = backend
+        self.default_database = default_database
+
+    def __repr__(self) -> str:
+        return f"MemoryClient(default_database={self.default_database!r})"
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.get_database(name)
+
+    def get_database(self, name: Optional[str] = None, **kwargs: Any) -> MemoryDatabase:
+        return self.backend._get_database(self, name or self.default_database or DEFAULT_DATABASE)
+
+    def list_database_names(self) -> List[str]:
+        return self.backend.list_database_names()
+
+    def drop_database(self, name: Any) -> None:
+        self.backend.drop_database(name if isinstance(name, str) else name.name)
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(Backend):
+    """
+    Backend storing all the data in the process memory. The data lives as long as the backend instance.
+
+        >>> backend = MemoryBackend()
+        >>> MongoAPI.connect(backend=backend, database="test")
+
+    The uri with the `memory://` scheme uses the module level `default_memory_backend`, so the
+    connection can be switched to memory through configuration alone.
+
+        >>> MongoAPI.connect(uri="memory:///test")
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def create_client(self,
+                      host: Union[str, None] = None,
+                      port: Union[int, None] = 27017,
+                      uri: Union[str, None] = None) -> MemoryClient:
+        default_database = None
+        if uri:
+            default_database = urlparse(uri).path.lstrip("/") or None
+        return MemoryClient(self, default_database)
+
+    def _get_database(self, client: MemoryClient, name: str) -> MemoryDatabase:
+        with self._lock:
+            database = self._databases.get(name)
+            if database is None:
+                database = self._databases[name] = MemoryDatabase(client, name)
+            database._create()
+            return database
+
+    def list_database_names(self) -> List[str]:
+        with self._lock:
+            return [name for name, database in self._databases.items() if database.exists]
+
+    def drop_database(self, name: str) -> None:
+        with self._lock:
+            database = self._databases.get(name)
+        if database is not None:
+            database._clear()
+
+    def reset(self) -> None:
+        """Drop all the stored data. The databases and collections objects are kept, the connections
+        and models holding them see the empty collections."""
+        with self._lock:
+            databases = list(self._databases.values())
+        for database in databases:
+            database._clear()
+
+
+default_memory_backend = MemoryBackend()
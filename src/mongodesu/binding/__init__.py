@@ -0,0 +1,7 @@
+from .binding import ModelBinding, get_binding, clear_bindings
+
+__all__ = [
+    "ModelBinding",
+    "get_binding",
+    "clear_bindings"
+]
@@ -0,0 +1,109 @@
+import threading
+from typing import Any, Tuple, Type, TYPE_CHECKING
+from weakref import WeakKeyDictionary
+
+from mongodesu.fields.base import declared_fields
+from mongodesu.routing.options import ROUTING_OPTIONS, Routing, routed_collection
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import Model
+
+
+class ModelBinding:
+    """
+    The client, database and collection a model class operates on, resolved once from its `connection`
+    (or the `MongoAPI.connect` class connection), `collection_name` and routing options.
+    The binding is immutable, a changed connection or option binds the model again, so the threads
+    share a binding without locking.
+
+    Attributes:
+        model: The model class.
+        client: The client of the database.
+        db: The database.
+        collection_name (str): The resolved collection name.
+        routing (Routing): The routing declared on the model.
+        collection: The collection handle with the routing of the model.
+    """
+    __slots__ = ("model", "client", "db", "collection_name", "routing", "collection", "options")
+
+    def __init__(self, model: Type["Model"], db: Any, collection_name: str, options: Tuple[Any, ...]) -> None:
+        routing = Routing.from_model(model)
+        if routing.is_default:
+            collection = db.get_collection(collection_name)
+        else:
+            collection = routed_collection(db, collection_name, routing)
+        for name, value in (("model", model), ("client", getattr(db, 'client', None)), ("db", db),
+                            ("collection_name", collection_name), ("routing", routing),
+                            ("collection", collection), ("options", options)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ModelBinding is immutable.")
+
+    def matches(self, db: Any, collection_name: str, options: Tuple[Any, ...]) -> bool:
+        return self.db is db and self.collection_name == collection_name and self.options == options
+
+    def collection_with(self, **options: Any) -> Any:
+        """The collection handle with the routing options over the routing of the model, see `Routing`."""
+        if not any(value is not None for value in options.values()):
+            return self.collection
+        return routed_collection(self.db, self.collection_name, self.routing.merge(**options))
+
+    def ensure_indexes(self) -> None:
+        """Creates the indexes of the fields declared with `unique` or `index`."""
+        for key, field in declared_fields(self.model).items():
+            kwargs = {}
+            if getattr(field, 'unique', False) is True:
+                kwargs['unique'] = True
+            if kwargs or getattr(field, 'index', False) is True:
+                self.collection.create_index(keys=key, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"ModelBinding({self.model.__name__}, {self.collection_name!r}, {self.routing!r})"
+
+
+_lock = threading.Lock()
+_bindings: "WeakKeyDictionary[type, ModelBinding]" = WeakKeyDictionary()
+
+
+def resolve_database(model: Type["Model"]) -> Any:
+    connection = getattr(model, 'connection', None)
+    db = connection.db if connection else getattr(model, 'db', None)
+    if db is None:
+        raise ValueError(f"{model.__name__} is not connected, set its connection or call MongoAPI.connect first.")
+    return db
+
+
+def resolve_collection_name(model: Type["Model"]) -> str:
+    name = getattr(model, 'collection_name', None)
+    if not name:
+        from mongodesu.mongolib import pluralize
+
+        name = pluralize(model.__name__)
+    return name
+
+
+def get_binding(model: Type["Model"]) -> ModelBinding:
+    """
+    The binding of the model class. The bindings are cached per class and checked against the current connection,
+    collection name and routing options, the indexes are created once per binding instead of per instantiation.
+    """
+    db = resolve_database(model)
+    collection_name = resolve_collection_name(model)
+    options = tuple(getattr(model, name, None) for name in ROUTING_OPTIONS)
+    binding = _bindings.get(model)
+    if binding is not None and binding.matches(db, collection_name, options):
+        return binding
+    with _lock:
+        binding = _bindings.get(model)
+        if binding is None or not binding.matches(db, collection_name, options):
+            binding = ModelBinding(model, db, collection_name, options)
+            binding.ensure_indexes()
+            _bindings[model] = binding
+        return binding
+
+
+def clear_bindings() -> None:
+    """Drops the cached bindings, the models are bound again on their next operation."""
+    with _lock:
+        _bindings.clear()
@@ -0,0 +1,10 @@
+from .stream import ChangeEvent, ModelChangeStream
+from .tokens import ResumeTokenStore, MemoryTokenStore, CollectionTokenStore
+
+__all__ = [
+    "ChangeEvent",
+    "ModelChangeStream",
+    "ResumeTokenStore",
+    "MemoryTokenStore",
+    "CollectionTokenStore"
+]
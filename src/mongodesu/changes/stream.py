@@ -0,0 +1,206 @@
+import logging
+import time
+from typing import Any, Callable, Dict, Generic, Iterator, List, Mapping, Optional, Sequence, Type, TypeVar, \
+    TYPE_CHECKING
+
+from mongodesu.changes.tokens import ResumeTokenStore
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import Model
+
+M = TypeVar('M', bound='Model')
+
+# Top level keys of the change events kept when the full documents are projected to the requested fields
+CHANGE_EVENT_KEYS = ("operationType", "documentKey", "ns", "to", "wallTime", "clusterTime", "updateDescription")
+
+
+class ChangeEvent(Generic[M]):
+    """
+    One change of the watched collection.
+
+    Attributes:
+        operation_type: `insert`, `update`, `replace`, `delete` or the other change stream operation types.
+        document_id: The `_id` of the changed document.
+        instance: The model instance hydrated from the full document, or from the updated fields if the full
+            document is not available. None for the deletes.
+        updated_fields: The fields set by an update.
+        removed_fields: The fields removed by an update.
+        resume_token: The token to resume the change stream after this change.
+        raw: The change event document as returned by the server.
+    """
+
+    def __init__(self, model: Type[M], raw: Mapping[str, Any], fields: Optional[Sequence[str]] = None) -> None:
+        self.model = model
+        self.raw = raw
+        self.operation_type: str = raw.get("operationType", "")
+        self.document_id = raw.get("documentKey", {}).get("_id")
+        self.resume_token = raw.get("_id")
+        description = raw.get("updateDescription") or {}
+        self.updated_fields: Dict[str, Any] = dict(description.get("updatedFields") or {})
+        self.removed_fields: List[str] = list(description.get("removedFields") or [])
+        self.instance: Optional[M] = self._hydrate(fields)
+
+    def _hydrate(self, fields: Optional[Sequence[str]]) -> Optional[M]:
+        document = self.raw.get("fullDocument")
+        if document is None:
+            if self.operation_type != "update":
+                return None
+            # Incremental hydration from the update description, only the top level updated fields are set
+            document = {key: value for key, value in self.updated_fields.items() if "." not in key}
+            document["_id"] = self.document_id
+        if fields:
+            document = {key: value for key, value in document.items() if key == "_id" or key in fields}
+        try:
+            return self.model(**document)
+        except ValueError:
+            logging.getLogger("mongodesu.changes").warning(
+                "Could not hydrate %s from the %s change of %s", self.model.__name__, self.operation_type,
+                self.document_id, exc_info=True)
+            return None
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.operation_type}, {self.model.__name__}, {self.document_id!r})"
+
+
+class ModelChangeStream(Generic[M]):
+    """
+    Change stream subscription of a model, returned from `Model.watch`. The changes are returned as `ChangeEvent`
+    with the model instance hydrated. The stream is opened on creation, like the pymongo change streams.
+
+    The resume token of a change is saved to the token store once the next change is requested (or on `commit`
+    and `close`), so a restarted subscription replays the change which was being processed: at-least-once delivery.
+
+        >>> with User.watch(fields=["email"], token_store=store) as stream:
+        ...     for batch in stream.batches(max_size=100, max_wait=1.0):
+        ...         search_index.update([event.instance for event in batch])
+
+    Args:
+        model (Type[M]): The model class to hydrate the documents with.
+        collection: The collection to watch.
+        pipeline (Optional[List[Mapping[str, Any]]], optional): Aggregation stages to filter the changes on the server.
+        fields (Optional[Sequence[str]], optional): The fields of the full document to return, projected on the server.
+        full_document (Optional[str], optional): The `full_document` option of the change stream.
+        token_store (Optional[ResumeTokenStore], optional): Store to load the resume token from and save it to.
+        name (Optional[str], optional): The name of the subscription in the token store. Defaults to the collection name.
+        on_change (Sequence[Callable[[ChangeEvent], Any]], optional): Callbacks called with every change,
+            e.g. to invalidate the caches of the model.
+        max_await_time_ms (int, optional): The maximum time the server waits for new changes on each read.
+    """
+
+    def __init__(self,
+                 model: Type[M],
+                 collection: Any,
+                 pipeline: Optional[List[Mapping[str, Any]]] = None,
+                 fields: Optional[Sequence[str]] = None,
+                 full_document: Optional[str] = "updateLookup",
+                 token_store: Optional[ResumeTokenStore] = None,
+                 name: Optional[str] = None,
+                 on_change: Sequence[Callable[[ChangeEvent[M]], Any]] = (),
+                 max_await_time_ms: int = 1000,
+                 **kwargs: Any) -> None:
+        self.model = model
+        self.collection = collection
+        self.fields = list(fields) if fields else None
+        self.pipeline = list(pipeline or [])
+        if self.fields:
+            projection = {key: 1 for key in CHANGE_EVENT_KEYS}
+            projection.update({f"fullDocument.{field}": 1 for field in ["_id", *self.fields]})
+            self.pipeline.append({"$project": projection})
+        self.full_document = full_document
+        self.token_store = token_store
+        self.name = name or collection.name
+        self.on_change = list(on_change)
+        self.max_await_time_ms = max_await_time_ms
+        self.watch_kwargs = kwargs
+        self._stream: Any = None
+        self._pending_token: Optional[Mapping[str, Any]] = None
+        self._closed = False
+        self._open()
+
+    def _open(self) -> Any:
+        if self._stream is None:
+            if self._closed:
+                raise StopIteration
+            resume_after = self.token_store.load(self.name) if self.token_store else None
+            self._stream = self.collection.watch(self.pipeline, full_document=self.full_document,
+                                                 resume_after=resume_after, max_await_time_ms=self.max_await_time_ms,
+                                                 **self.watch_kwargs)
+        return self._stream
+
+    def commit(self) -> None:
+        """Save the resume token of the last returned change to the token store."""
+        token, self._pending_token = self._pending_token, None
+        if token is not None and self.token_store is not None:
+            self.token_store.save(self.name, token)
+
+    def _event(self, raw: Mapping[str, Any]) -> ChangeEvent[M]:
+        event = ChangeEvent(self.model, raw, self.fields)
+        self._pending_token = event.resume_token
+        for callback in self.on_change:
+            try:
+                callback(event)
+            except Exception:
+                logging.getLogger("mongodesu.changes").exception("on_change callback %r failed", callback)
+        return event
+
+    def _fetch(self) -> Optional[ChangeEvent[M]]:
+        raw = self._open().try_next()
+        return self._event(raw) if raw is not None else None
+
+    def try_next(self) -> Optional[ChangeEvent[M]]:
+        """Returns the next change, or None if there is no change within the `max_await_time_ms`."""
+        self._open()
+        self.commit()
+        return self._fetch()
+
+    def __iter__(self) -> Iterator[ChangeEvent[M]]:
+        return self
+
+    def __next__(self) -> ChangeEvent[M]:
+        while True:
+            if self._closed:
+                raise StopIteration
+            event = self.try_next()
+            if event is not None:
+                return event
+
+    def batches(self, max_size: int = 100, max_wait: float = 1.0) -> Iterator[List[ChangeEvent[M]]]:
+        """
+        Yields the changes in batches, a batch is yielded once it has `max_size` changes or `max_wait` seconds
+        passed since its first change. The generator runs until the stream is closed.
+
+        The resume token is saved once the consumer asks for the next batch, the changes of a batch which was
+        not completely processed are delivered again after a restart.
+        """
+        batch: List[ChangeEvent[M]] = []
+        started = 0.0
+        self._open()
+        self.commit()
+        while not self._closed:
+            event = self._fetch()
+            self._pending_token = None
+            if event is not None:
+                if not batch:
+                    started = time.monotonic()
+                batch.append(event)
+            if batch and (len(batch) >= max_size or time.monotonic() - started >= max_wait):
+                yield batch
+                self._pending_token = batch[-1].resume_token
+                self.commit()
+                batch = []
+
+    @property
+    def resume_token(self) -> Optional[Mapping[str, Any]]:
+        return self._stream.resume_token if self._stream is not None else None
+
+    def close(self) -> None:
+        self.commit()
+        self._closed = True
+        if self._stream is not None:
+            self._stream.close()
+
+    def __enter__(self) -> "ModelChangeStream[M]":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,58 @@
+import threading
+from typing import Any, Dict, Mapping, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import MongoAPI
+
+
+class ResumeTokenStore:
+    """
+    Base class for the stores persisting the resume tokens of the change streams, so a restarted
+    subscription continues from the last processed change.
+    """
+
+    def load(self, name: str) -> Optional[Mapping[str, Any]]:
+        raise NotImplementedError("Subclasses must implement the load method.")
+
+    def save(self, name: str, token: Mapping[str, Any]) -> None:
+        raise NotImplementedError("Subclasses must implement the save method.")
+
+
+class MemoryTokenStore(ResumeTokenStore):
+    """Keeps the resume tokens in the process memory, the subscriptions resume within the same process only."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, Mapping[str, Any]] = {}
+
+    def load(self, name: str) -> Optional[Mapping[str, Any]]:
+        with self._lock:
+            return self._tokens.get(name)
+
+    def save(self, name: str, token: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._tokens[name] = token
+
+
+class CollectionTokenStore(ResumeTokenStore):
+    """
+    Persists the resume tokens in a mongodb collection, one document per subscription name.
+
+        >>> store = CollectionTokenStore(mongo, collection_name="resume_tokens")
+        >>> User.watch(token_store=store, name="user-search-indexer")
+
+    Args:
+        connection (MongoAPI): The connection of the database to store the tokens in.
+        collection_name (str, optional): Defaults to "mongodesu_resume_tokens".
+    """
+
+    def __init__(self, connection: Union["MongoAPI", Any], collection_name: str = "mongodesu_resume_tokens") -> None:
+        db = getattr(connection, 'db', connection)
+        self.collection = db.get_collection(collection_name)
+
+    def load(self, name: str) -> Optional[Mapping[str, Any]]:
+        document = self.collection.find_one({"_id": name})
+        return document["token"] if document else None
+
+    def save(self, name: str, token: Mapping[str, Any]) -> None:
+        self.collection.update_one({"_id": name}, {"$set": {"token": token}}, upsert=True)
@@ -0,0 +1,6 @@
+from .cache import CountCache, invalidating
+
+__all__ = [
+    "CountCache",
+    "invalidating"
+]
@@ -0,0 +1,164 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import Model
+
+logger = logging.getLogger("mongodesu.counts")
+
+# The database and the name of a collection
+_CollectionKey = Tuple[Any, str]
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "refreshing")
+
+    def __init__(self, value: int, fresh_until: float, stale_until: float) -> None:
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.refreshing = False
+
+
+def query_key(*parts: Any) -> str:
+    """The key of a count query, from its filter and options. The order of the keys of the filter is kept."""
+    return json.dumps(parts, default=repr)
+
+
+class CountCache:
+    """
+    Caches the results of `count_documents` of the models declaring it as their `count_cache`, per collection
+    and filter. The counts of a collection are invalidated on the writes of the models to it, the writes
+    of the other processes are only seen once the counts expire.
+
+        >>> class Order(Model):
+        ...     count_cache = CountCache(ttl=30, stale_ttl=300)
+
+    With `stale_ttl`, an expired or invalidated count is returned for `stale_ttl` more seconds while it is
+    refreshed in the background, so the callers never wait for the count once it was cached.
+
+    Args:
+        ttl (float, optional): The seconds a count is fresh. Defaults to 30.
+        stale_ttl (float, optional): The seconds after the `ttl` an expired count is returned while refreshing. Defaults to 0.
+        max_entries (int, optional): The maximum number of the cached counts, the least recently used are evicted. Defaults to 10000.
+        max_workers (int, optional): The number of the threads refreshing the counts. Defaults to 2.
+    """
+
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 0.0, max_entries: int = 10000, max_workers: int = 2) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        # In the order of their last use, the least recently used count first
+        self._entries: "OrderedDict[Tuple[_CollectionKey, Hashable], _Entry]" = OrderedDict()
+        # The keys of the counts of every collection, to invalidate them
+        self._keys: Dict[_CollectionKey, Set[Hashable]] = {}
+        # Bumped on every invalidation, a count started before a write is not stored
+        self._generations: Dict[_CollectionKey, int] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, database: Any, collection_name: str, key: Hashable, count: Callable[[], int]) -> int:
+        """Returns the cached count of the query, or counts it with the `count` function and caches it."""
+        collection = (database, collection_name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((collection, key))
+            generation = self._generations.get(collection, 0)
+            if entry is not None:
+                self._entries.move_to_end((collection, key))
+                if now < entry.fresh_until:
+                    self.hits += 1
+                    return entry.value
+                if now < entry.stale_until:
+                    self.stale_hits += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        self._refresh(collection, key, count, generation)
+                    return entry.value
+            self.misses += 1
+        value = count()
+        self._store(collection, key, value, generation)
+        return value
+
+    def _refresh(self, collection: _CollectionKey, key: Hashable, count: Callable[[], int], generation: int) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="mongodesu-counts")
+
+        def run() -> None:
+            try:
+                self._store(collection, key, count(), generation)
+            except Exception:
+                logger.exception("Could not refresh the count of %s", collection[1])
+                with self._lock:
+                    entry = self._entries.get((collection, key))
+                    if entry is not None:
+                        entry.refreshing = False
+
+        self._executor.submit(run)
+
+    def _store(self, collection: _CollectionKey, key: Hashable, value: int, generation: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._generations.get(collection, 0) != generation:
+                return # Written while counting
+            self._entries[(collection, key)] = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl)
+            self._entries.move_to_end((collection, key))
+            self._keys.setdefault(collection, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                (evicted, evicted_key), _ = self._entries.popitem(last=False)
+                keys = self._keys[evicted]
+                keys.discard(evicted_key)
+                if not keys:
+                    del self._keys[evicted]
+
+    def invalidate(self, database: Any, collection_name: str) -> None:
+        """Expires the counts of the collection. With `stale_ttl` they are returned while refreshing."""
+        collection = (database, collection_name)
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            if self.stale_ttl:
+                for key in self._keys.get(collection, ()):
+                    entry = self._entries[(collection, key)]
+                    entry.fresh_until = 0.0
+                    # The refresh running was started before the write, a new one is needed
+                    entry.refreshing = False
+            else:
+                for key in self._keys.pop(collection, ()):
+                    del self._entries[(collection, key)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            for collection in self._generations:
+                self._generations[collection] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class invalidating:
+    """Context manager of the writes of a model, expires the cached counts of the collection once the write is done
+    or failed, if the model has a `count_cache`."""
+
+    __slots__ = ("cache", "collection")
+
+    def __init__(self, model: Type["Model"], collection: Any) -> None:
+        self.cache: Optional[CountCache] = getattr(model, 'count_cache', None)
+        self.collection = collection
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *args: Any) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(self.collection.database, self.collection.name)
@@ -1,4 +1,4 @@
-from .types import StringField, NumberField, BooleanField, DateField, ForeignField, ListField
+from .fields import StringField, NumberField, BooleanField, DateField, ForeignField, ListField
 from bson import ObjectId
 
 
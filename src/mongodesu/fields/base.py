@@ -1,5 +1,6 @@
-from typing import TypeVar, Generic
+from typing import Any, Dict, List, TypeVar, Generic, Union
 from inspect import isfunction
+from weakref import WeakKeyDictionary
 
 T = TypeVar('T')
 
@@ -31,6 +32,11 @@ class Field(Generic[T]):
     def validate(self, value: T, field_name: str):
         raise NotImplementedError("Subclasses must implement the validate method.")
     
+    def json_schema(self) -> Dict[str, Any]:
+        """The `$jsonSchema` of the field for the server side validator. Subclasses should override it,
+        an empty schema accepts any value."""
+        return {}
+    
     def get_distinct_list(self, list1, list2):
         set1 = set(list1)
         set2 = set(list2)
@@ -42,4 +48,56 @@ class Field(Generic[T]):
         if hasattr(self, "default"):
             return self.default if not isfunction(self.default) else self.default()
         return None
-    
+
+
+# Bson types of the python types, for the `$jsonSchema` of the fields
+_BSON_TYPES = {
+    "str": ["string"],
+    "int": ["int", "long"],
+    "float": ["double"],
+    "bool": ["bool"],
+    "dict": ["object"],
+    "list": ["array"],
+    "ObjectId": ["objectId"],
+    "datetime": ["date"],
+    "date": ["date"],
+    "Decimal128": ["decimal"],
+    "bytes": ["binData"],
+}
+
+
+def bson_types(python_type: Any) -> Union[str, List[str], None]:
+    """Returns the bson type name(s) of a python type, e.g. `int` -> `["int", "long"]`, or of a tuple of types as
+    accepted by `isinstance`. The subclasses have the type of their base, None if a type has no bson type."""
+    types: List[str] = []
+    for item in (python_type if isinstance(python_type, tuple) else (python_type,)):
+        known = next((_BSON_TYPES[base.__name__] for base in getattr(item, "__mro__", ())
+                      if base.__name__ in _BSON_TYPES), None)
+        if known is None:
+            return None
+        types.extend(name for name in known if name not in types)
+    if not types:
+        return None
+    return types[0] if len(types) == 1 else types
+
+
+def nullable(bson_type: Union[str, List[str]], required: bool) -> Union[str, List[str]]:
+    """The non required fields accept null, as they are stored with the None value when not provided."""
+    if required:
+        return bson_type
+    return (list(bson_type) if isinstance(bson_type, list) else [bson_type]) + ["null"]
+
+
+_declared_fields_cache: "WeakKeyDictionary[type, Dict[str, Field]]" = WeakKeyDictionary()
+
+
+def declared_fields(owner: type) -> Dict[str, Field]:
+    """
+    Returns the fields declared on the class, in the order of declaration.
+    The result is computed once per class, the fields of a class are not expected to change after its creation.
+    """
+    fields = _declared_fields_cache.get(owner)
+    if fields is None:
+        fields = {key: value for key, value in owner.__dict__.items() if isinstance(value, Field)}
+        _declared_fields_cache[owner] = fields
+    return fields
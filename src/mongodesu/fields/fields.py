@@ -0,0 +1,217 @@
+
+from mongodesu.fields.base import Field, bson_types, nullable
+from typing import Any, Dict, Union, List, TYPE_CHECKING
+from datetime import date, datetime
+from bson import ObjectId
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import Model
+
+class StringField(Field[str]):
+    def __init__(self, size: int = -1, required: bool = False, unique: bool = False, index: bool = False, default: Union[str, None] = None, enum: Union[List[str], None] = None) -> None:
+        super().__init__()
+        self.size = size if size > 0 else None
+        self.required = required
+        self.unique = unique
+        self.index = index
+        self.default = default
+        self.enum = enum
+        
+    def validate(self, value, field_name: str):
+        if not self.required and self.default:
+            # print(f"{field_name} value:= {self.default}")
+            setattr(self, field_name, self.default)
+            value = self.default # for subsequest error test
+        if self.required and value is None and (self.default is not None):
+            setattr(self, field_name, self.default)
+            value = self.default
+        if self.required and not value:
+            raise ValueError(f"Field {field_name} marked as required and no value provided.")
+        if not isinstance(value, str) and value is not None:
+            raise ValueError(f"Field {field_name} -> String is expected.")
+        if self.size and len(value) > self.size:
+            raise ValueError(f"{field_name} size exceeded, max size {self.size}. Provided {len(value)}")
+        if self.enum is not None and value is not None and value not in self.enum:
+            raise ValueError(f"{field_name} should be one of {self.enum}.")
+    
+    def json_schema(self) -> Dict[str, Any]:
+        schema: Dict[str, Any] = {"bsonType": nullable("string", self.required)}
+        if self.required:
+            schema["minLength"] = 1
+        if self.size:
+            schema["maxLength"] = self.size
+        if self.enum is not None:
+            schema["enum"] = list(self.enum) + ([] if self.required else [None])
+        return schema
+        
+    
+        
+## Number field start
+class NumberField(Field[Union[int, float]]):
+    def __init__(self, required: bool = False, unique: bool = False, index: bool = False, default: Union[int, float, None] = None, enum: Union[List[Union[int, float]], None] = None) -> None:
+        super().__init__()
+        self.required = required
+        self.unique = unique
+        self.index = index
+        self.default = default
+        self.enum = enum
+        
+    
+    def validate(self, value, field_name):
+        if not self.required and not (self.default is None):
+            setattr(self, field_name, self.default)
+            value = self.default
+        if self.required and value is None:
+            raise ValueError(f"Field {field_name} marked as required. But does not provide any value")
+        # bool is a subclass of int, but not a number for the `$jsonSchema` of the field
+        if ((not isinstance(value, int)) and (not isinstance(value, float)) and value is not None) or isinstance(value, bool):
+            raise ValueError(f"Field {field_name} Only number value accepted. integer and Float")
+        if self.enum is not None and value is not None and value not in self.enum:
+            raise ValueError(f"{field_name} should be one of {self.enum}.")
+    
+    def json_schema(self) -> Dict[str, Any]:
+        schema: Dict[str, Any] = {"bsonType": nullable(["int", "long", "double", "decimal"], self.required)}
+        if self.enum is not None:
+            schema["enum"] = list(self.enum) + ([] if self.required else [None])
+        return schema
+    
+    
+
+class ListField(Field[List[Any]]):
+    def __init__(self, required: bool = False, item_type: Union[Any, None] = None, default: Union[List[Any], None] = None) -> None:
+        super().__init__()
+        self.required = required
+        self.item_type = item_type
+        self.default = default
+
+    def validate(self, value, field_name):
+        if not self.required and self.default:
+            # print(f"{field_name} value:= {self.default}")
+            setattr(self, field_name, self.default)
+            value = self.default # for subsequest error test
+        
+        if self.required and not value:
+            raise ValueError(f"Field {field_name} marked as required and no value provided.")
+        if not isinstance(value, list) and value is not None:
+            raise ValueError(f"{field_name} List value expected.")
+        if self.item_type:
+            for item in value:
+                if not isinstance(item, self.item_type):
+                    raise ValueError(f"{field_name} List items must be of type {self.item_type.__name__}.")
+    
+    def json_schema(self) -> Dict[str, Any]:
+        schema: Dict[str, Any] = {"bsonType": nullable("array", self.required)}
+        if self.required:
+            schema["minItems"] = 1
+        item_types = bson_types(self.item_type) if self.item_type else None
+        if item_types is not None:
+            # The items of the types without a bson type, e.g. the custom classes, are only validated on the client
+            schema["items"] = {"bsonType": item_types}
+        return schema
+
+
+
+
+class DateField(Field):
+    def __init__(self, required: bool = False, unique: bool = False, index: bool = False, default: Union[date, datetime, None] = None) -> None:
+        super().__init__()
+        self.required = required
+        self.unique = unique
+        self.index = index
+        self.default = default
+
+    @staticmethod
+    def to_datetime(value):
+        """Converts the string dates and the dates to datetime, the values stored as bson dates."""
+        # Special case if the value is passed as string of date then need to convert to the date
+        if isinstance(value, str):
+            from dateutil import parser # Deferred, only needed for the string dates
+            value = parser.parse(value) # Will try to convert to date, and results in error if wrong format provided
+        if isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        return value
+
+    def __set__(self, obj, value):
+        # The value is stored converted, the `$jsonSchema` of the field requires a bson date
+        super().__set__(obj, self.to_datetime(value))
+
+    def validate(self, value, field_name):
+        if not self.required and self.default:
+            # print(f"{field_name} value:= {self.default}")
+            setattr(self, field_name, self.default)
+            value = self.default # for subsequest error test
+        value = self.to_datetime(value)
+        if self.required and value is None:
+            raise ValueError(f"Field {field_name} marked as required and no value provided.")
+        if not isinstance(value, (date, datetime)):
+            if value is not None:              
+                raise ValueError(f"{field_name} Date or datetime value expected.")
+    
+    def json_schema(self) -> Dict[str, Any]:
+        return {"bsonType": nullable("date", self.required)}
+
+
+
+class BooleanField(Field[bool]):
+    def __init__(self, required: bool = False, unique: bool = False, index: bool = False, default: Union[bool, None] = None) -> None:
+        super().__init__()
+        self.required = required
+        self.unique = unique
+        self.index = index
+        self.default = default
+
+    def validate(self, value, field_name):
+        if not self.required and not (self.default is None):
+            # print(f"{field_name} value:= {self.default}")
+            setattr(self, field_name, self.default)
+            value = self.default # for subsequest error test
+        
+        if self.required and value is None:
+            raise ValueError(f"Field {field_name} marked as required and no value provided.")
+        # Special case -> None will consider as false
+        value = False if value is None else value
+        if not isinstance(value, bool):
+            raise ValueError(f"{field_name} Boolean value expected.")
+    
+    def json_schema(self) -> Dict[str, Any]:
+        return {"bsonType": nullable("bool", self.required)}
+
+
+
+class ForeignField(Field[Union[str, ObjectId]]):
+    def __init__(self, model: "Model",  parent_field: str = "_id", required: bool = False, default: Union[str, ObjectId, None] = None, existance_check: bool = False) -> None:
+        super().__init__()       
+        self.foreign_model = model
+        self.required = required
+        self.parent_field = parent_field
+        self.default = default
+        self.existance_check = existance_check
+        
+        
+    def validate(self, value, field_name):
+        from mongodesu.mongolib import Model
+         ## Check if the model is a valid Model class
+        if not issubclass(self.foreign_model, Model):
+            raise Exception("model should be a valid Model class.")
+        
+        if not self.required and not (self.default is None):
+            # print(f"{field_name} value:= {self.default}")
+            setattr(self, field_name, self.default)
+            value = self.default # for subsequest error test
+        
+        if self.required and not value:
+            raise ValueError(f"{field_name} marked as required. no value provided.")
+        if not isinstance(value, str) and not isinstance(value, ObjectId):
+            raise ValueError(f"{field_name} should be string or object id instance.")
+        if not ObjectId.is_valid(value):
+            raise ValueError(f"{field_name} is not a valid objectId")
+        
+        if self.existance_check is True:
+            ## Check if the value is in the model
+            model = self.foreign_model()
+            exist_data = model.find_one({"_id": value})
+            if not exist_data:
+                raise ModuleNotFoundError(f"{field_name} equivalant data not found.")
+    
+    def json_schema(self) -> Dict[str, Any]:
+        return {"bsonType": nullable(["objectId", "string"], self.required)}
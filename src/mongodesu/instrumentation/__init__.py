@@ -0,0 +1,18 @@
+from .hooks import Instrument, QueryEvent, register, unregister, registered_instruments, track, redact_filter
+from .slow_query import SlowQueryLogger
+from .metrics import MetricsInstrument, Counter, Gauge, Histogram
+
+__all__ = [
+    "Instrument",
+    "QueryEvent",
+    "register",
+    "unregister",
+    "registered_instruments",
+    "track",
+    "redact_filter",
+    "SlowQueryLogger",
+    "MetricsInstrument",
+    "Counter",
+    "Gauge",
+    "Histogram"
+]
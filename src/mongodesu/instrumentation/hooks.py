@@ -0,0 +1,226 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Iterable, List, Mapping, Optional, Tuple, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import Model
+
+REDACTED = "?"
+
+
+def redact_filter(filter: Any) -> Any:
+    """
+    Returns the shape of the filter with all the values replaced by `?`, the field names and operators are kept.
+
+        >>> redact_filter({"age": {"$gt": 30}, "$or": [{"name": "John"}, {"tags": {"$in": ["a", "b"]}}]})
+        {'age': {'$gt': '?'}, '$or': [{'name': '?'}, {'tags': {'$in': '?'}}]}
+    """
+    if isinstance(filter, Mapping):
+        shape = {}
+        for key, value in filter.items():
+            if key in ("$and", "$or", "$nor") and isinstance(value, list):
+                shape[key] = [redact_filter(item) for item in value]
+            elif isinstance(value, Mapping) and value and all(str(k).startswith("$") for k in value):
+                shape[key] = {operator: redact_filter(operand) if operator in ("$elemMatch", "$not") else REDACTED
+                              for operator, operand in value.items()}
+            else:
+                shape[key] = REDACTED
+        return shape
+    if filter is None:
+        return {}
+    return REDACTED
+
+
+def shape_key(shape: Any) -> str:
+    """A stable string for the filter shape to group the queries with."""
+    return json.dumps(shape, sort_keys=True)
+
+
+def filter_fields(filter: Any) -> List[str]:
+    """The field names the filter tests on the top level and in the `$and` clauses."""
+    fields: List[str] = []
+    if not isinstance(filter, Mapping):
+        return fields
+    for key, value in filter.items():
+        if key == "$and" and isinstance(value, list):
+            for item in value:
+                fields.extend(field for field in filter_fields(item) if field not in fields)
+        elif not str(key).startswith("$") and key not in fields:
+            fields.append(key)
+    return fields
+
+
+def indexed_fields(model: Type["Model"]) -> List[str]:
+    """The fields declared with `index=True` or `unique=True` on the model, along with the `_id`."""
+    from mongodesu.fields.base import Field
+
+    fields = ["_id"]
+    for key, value in model.__dict__.items():
+        if isinstance(value, Field) and (getattr(value, 'index', False) or getattr(value, 'unique', False)):
+            fields.append(key)
+    return fields
+
+
+class QueryEvent:
+    """
+    Describes one operation of a `Model`. The event is passed to the `before` hook of the instruments
+    and once the operation completes to the `after` hook with the result attributes set.
+
+    Attributes:
+        model: The model class the operation ran on.
+        operation: The name of the operation, e.g. `find`, `insert_many`.
+        filter: The raw filter of the operation. Use `filter_shape` when reporting, it has the values redacted.
+        duration: The duration of the operation in seconds, set on completion.
+        documents: The number of the documents returned or affected, set on completion.
+        bytes: The bson size of the documents returned or written. Only measured if any instrument sets `measure_bytes`.
+        error: The exception raised by the operation if it failed.
+        collection: The collection the operation ran on.
+    """
+
+    def __init__(self, model: Type["Model"], operation: str, filter: Any = None, measure_bytes: bool = False,
+                 collection: Any = None) -> None:
+        self.model = model
+        self.operation = operation
+        self.filter = filter
+        self.collection = collection
+        self.measure_bytes = measure_bytes
+        self.started_at: float = 0.0
+        self.duration: Optional[float] = None
+        self.documents = 0
+        self.bytes = 0
+        self.error: Optional[BaseException] = None
+        self._filter_shape: Any = None
+
+    @property
+    def model_name(self) -> str:
+        return self.model.__name__
+
+    @property
+    def filter_shape(self) -> Any:
+        if self._filter_shape is None:
+            self._filter_shape = redact_filter(self.filter)
+        return self._filter_shape
+
+    @property
+    def uses_index(self) -> bool:
+        """Whether the filter tests any field the model declares an index on."""
+        indexes = indexed_fields(self.model)
+        return any(field in indexes for field in filter_fields(self.filter))
+
+    def set_result(self, documents: int, docs: Optional[Iterable[Mapping[str, Any]]] = None) -> None:
+        """Record the number of documents returned or affected, and the bson size of `docs` if measured."""
+        self.documents = documents
+        if self.measure_bytes and docs is not None:
+            from bson import encode
+
+            self.bytes += sum(len(encode(doc)) for doc in docs)
+
+    def __repr__(self) -> str:
+        return (f"QueryEvent(model={self.model_name}, operation={self.operation}, filter={self.filter_shape}, "
+                f"duration={self.duration}, documents={self.documents})")
+
+
+class _NullEvent:
+    """Event handed out when no instrument is registered, all the recording is skipped."""
+    measure_bytes = False
+
+    def set_result(self, documents: int, docs: Optional[Iterable[Mapping[str, Any]]] = None) -> None:
+        pass
+
+
+NULL_EVENT = _NullEvent()
+
+
+class Instrument:
+    """
+    Base class for the instruments. Override the `before` and/or `after` hooks.
+    Set `measure_bytes` to True if the instrument needs the `bytes` of the events, measuring encodes the documents.
+    """
+    measure_bytes = False
+
+    def before(self, event: QueryEvent) -> None:
+        pass
+
+    def after(self, event: QueryEvent) -> None:
+        pass
+
+
+_lock = threading.Lock()
+_instruments: Tuple[Instrument, ...] = ()
+
+
+def register(instrument: Instrument) -> Instrument:
+    """Register the instrument for the operations of all the models."""
+    global _instruments
+    with _lock:
+        if instrument not in _instruments:
+            _instruments = _instruments + (instrument,)
+    return instrument
+
+
+def unregister(instrument: Instrument) -> None:
+    global _instruments
+    with _lock:
+        _instruments = tuple(item for item in _instruments if item is not instrument)
+
+
+def registered_instruments() -> Tuple[Instrument, ...]:
+    return _instruments
+
+
+def _instruments_for(model: Type["Model"]) -> Tuple[Instrument, ...]:
+    model_instruments = getattr(model, 'instruments', None)
+    if model_instruments:
+        return _instruments + tuple(model_instruments)
+    return _instruments
+
+
+class track:
+    """
+    Context manager timing one operation of the model and calling the hooks of the registered instruments.
+
+        >>> with track(User, "find", filter) as event:
+        ...     docs = list(collection.find(filter))
+        ...     event.set_result(len(docs), docs)
+
+    When no instrument is registered it returns the `NULL_EVENT` and does not time the operation.
+    The errors raised by the hooks are logged and never break the operation.
+    """
+
+    __slots__ = ("model", "operation", "filter", "collection", "event", "instruments")
+
+    def __init__(self, model: Type["Model"], operation: str, filter: Any = None, collection: Any = None) -> None:
+        self.model = model
+        self.operation = operation
+        self.filter = filter
+        self.collection = collection
+        self.event: Optional[QueryEvent] = None
+        self.instruments: Tuple[Instrument, ...] = ()
+
+    def __enter__(self) -> Any:
+        self.instruments = _instruments_for(self.model)
+        if not self.instruments:
+            return NULL_EVENT
+        measure_bytes = any(instrument.measure_bytes for instrument in self.instruments)
+        event = self.event = QueryEvent(self.model, self.operation, self.filter, measure_bytes, self.collection)
+        for instrument in self.instruments:
+            try:
+                instrument.before(event)
+            except Exception:
+                logging.exception("Instrument %r failed in the before hook", instrument)
+        event.started_at = time.perf_counter()
+        return event
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        event = self.event
+        if event is None:
+            return
+        event.duration = time.perf_counter() - event.started_at
+        event.error = exc
+        for instrument in self.instruments:
+            try:
+                instrument.after(event)
+            except Exception:
+                logging.exception("Instrument %r failed in the after hook", instrument)
@@ -0,0 +1,147 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from mongodesu.instrumentation.hooks import Instrument, QueryEvent
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    """A monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """A value which goes up and down, with labels."""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, labels: Labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """A histogram with cumulative buckets and labels."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            counts[bisect_left(self.buckets, value)] += 1
+            self._sums[labels] = self._sums.get(labels, 0.0) + value
+
+    def count(self, labels: Labels) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, counts in self._counts.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {self._sums[labels]}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsInstrument(Instrument):
+    """
+    Collects prometheus style counters and histograms of the model operations, labeled by the model and operation.
+
+        >>> from mongodesu.instrumentation import register, MetricsInstrument
+        >>> metrics = register(MetricsInstrument())
+        >>> print(metrics.render()) # Prometheus text exposition format, serve it on the /metrics endpoint
+
+    Args:
+        namespace (str, optional): The prefix of the metric names. Defaults to "mongodesu".
+        buckets (Sequence[float], optional): The upper bounds in seconds of the duration histogram buckets.
+        measure_bytes (bool, optional): Count the bson size of the documents, every returned or written document
+            is encoded once more to measure it. Defaults to False.
+    """
+
+    def __init__(self, namespace: str = "mongodesu", buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 measure_bytes: bool = False) -> None:
+        self.measure_bytes = measure_bytes
+        self.operations = Counter(f"{namespace}_operations_total", "Number of the model operations.")
+        self.errors = Counter(f"{namespace}_operation_errors_total", "Number of the failed model operations.")
+        self.documents = Counter(f"{namespace}_documents_total", "Number of the documents returned or affected.")
+        self.bytes = Counter(f"{namespace}_bytes_total", "Bson size of the documents returned or written.")
+        self.unindexed = Counter(f"{namespace}_unindexed_operations_total",
+                                 "Number of the filtered operations on fields without a declared index.")
+        self.duration = Histogram(f"{namespace}_operation_duration_seconds", "Duration of the model operations.",
+                                  buckets)
+
+    def after(self, event: QueryEvent) -> None:
+        labels = (("model", event.model_name), ("operation", event.operation))
+        self.operations.inc(labels)
+        self.duration.observe(labels, event.duration or 0.0)
+        self.documents.inc(labels, event.documents)
+        if self.measure_bytes:
+            self.bytes.inc(labels, event.bytes)
+        if event.error is not None:
+            self.errors.inc(labels)
+        if event.filter and not event.uses_index:
+            self.unindexed.inc(labels)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (self.operations, self.errors, self.documents, self.bytes, self.unindexed, self.duration):
+            if metric is not self.bytes or self.measure_bytes:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
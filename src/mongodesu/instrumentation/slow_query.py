@@ -0,0 +1,36 @@
+import logging
+from typing import Union
+
+from mongodesu.instrumentation.hooks import Instrument, QueryEvent
+
+
+class SlowQueryLogger(Instrument):
+    """
+    Logs the model operations which take longer than the threshold. The filter values are redacted.
+
+        >>> from mongodesu.instrumentation import register, SlowQueryLogger
+        >>> register(SlowQueryLogger(threshold_ms=50))
+
+    Args:
+        threshold_ms (float, optional): The duration in milliseconds from which an operation is logged. Defaults to 100.
+        logger (Union[logging.Logger, None], optional): The logger to write to. Defaults to the `mongodesu.slow_query` logger.
+        level (int, optional): The log level of the records. Defaults to `logging.WARNING`.
+    """
+
+    def __init__(self,
+                 threshold_ms: float = 100,
+                 logger: Union[logging.Logger, None] = None,
+                 level: int = logging.WARNING) -> None:
+        self.threshold_ms = threshold_ms
+        self.logger = logger or logging.getLogger("mongodesu.slow_query")
+        self.level = level
+
+    def after(self, event: QueryEvent) -> None:
+        duration_ms = (event.duration or 0.0) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        self.logger.log(
+            self.level,
+            "Slow query %s.%s took %.1fms filter=%s documents=%d uses_index=%s",
+            event.model_name, event.operation, duration_ms, event.filter_shape, event.documents, event.uses_index,
+        )
@@ -1,18 +1,34 @@
-from pymongo import MongoClient
-from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult
-from pymongo.cursor import Cursor
-from pymongo.command_cursor import CommandCursor
-from typing import Dict, Any, Iterable, Mapping, Optional, TypedDict, List, Union, Type, TypeVar
-import inflect
-from pymongo.bulk import RawBSONDocument
-from pymongo.client_session import ClientSession
-from pymongo.typings import _Pipeline, _CollationIn, Sequence
-from pymongo.collection import _IndexKeyHint, _DocumentType
-from pymongo.collection import abc, Collection
+from __future__ import annotations
+
+from collections import abc
+from functools import lru_cache
+from inspect import isfunction
+from typing import Callable, Dict, Any, Iterable, Mapping, Optional, Sequence, TypedDict, List, Union, Type, TypeVar, TYPE_CHECKING
 import logging
+import threading
+
+# The pymongo imports are only needed for the type hints, pymongo itself is loaded by the backend on connect
+if TYPE_CHECKING:
+    from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult
+    from pymongo.command_cursor import CommandCursor
+    from pymongo.bulk import RawBSONDocument
+    from pymongo.client_session import ClientSession
+    from pymongo.typings import _Pipeline, _CollationIn
+    from pymongo.collection import Collection, _IndexKeyHint, _DocumentType
 
-from mongodesu.fields.base import Field 
+from mongodesu.fields.base import Field, declared_fields
 from mongodesu.serializable import Serializable
+from mongodesu.serializable.encoder import get_encoder, export_ndjson
+from mongodesu.backends.base import Backend, PyMongoBackend
+from mongodesu.instrumentation.hooks import track
+from mongodesu.changes.stream import ModelChangeStream, ChangeEvent
+from mongodesu.changes.tokens import ResumeTokenStore
+from mongodesu.routing.options import split_routing
+from mongodesu.writebehind.buffer import WriteBehindBuffer
+from mongodesu.binding.binding import ModelBinding, get_binding, resolve_collection_name
+from mongodesu.routing.router import Router
+from mongodesu.routing.merge import normalize_sort, sort_documents
+from mongodesu.counts.cache import CountCache, invalidating, query_key
 
 class AttributeDict(TypedDict):
     type: str
@@ -23,6 +39,34 @@ class AttributeDict(TypedDict):
 
 M = TypeVar('M', bound='Model')
 
+# Collection names constructed from the model class names. It can be seeded to skip the inflect engine entirely
+COLLECTION_NAME_CACHE: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=None)
+def _inflect_engine():
+    import inflect # Slow to import and to build the engine, so only loaded if a collection name has to be constructed
+    return inflect.engine()
+
+
+def pluralize(class_name: str) -> str:
+    """Returns the collection name for the model class name, e.g. `User` -> `users`.
+    """
+    name = COLLECTION_NAME_CACHE.get(class_name)
+    if name is None:
+        name = COLLECTION_NAME_CACHE[class_name] = _inflect_engine().plural(class_name.lower())
+    return name
+
+# The positional arguments of `Collection.find`, in their order
+FIND_ARGUMENTS = ('filter', 'projection', 'skip', 'limit', 'no_cursor_timeout', 'cursor_type', 'sort',
+                  'allow_partial_results', 'oplog_replay', 'batch_size', 'collation', 'hint', 'max_scan',
+                  'max_time_ms', 'max', 'min', 'return_key', 'show_record_id', 'snapshot', 'comment', 'session',
+                  'allow_disk_use', 'let')
+
+# Serializes the connects, the client and the database of a connection are replaced together
+_connect_lock = threading.Lock()
+
+
 class MongoAPI:
     """A wraper for all the main crud operation and connection logic for the mongodb.
     """
@@ -30,85 +74,117 @@ class MongoAPI:
                  host: Union[str, None] = None, 
                  port: Union[int, None] = 27017,
                  uri: Union[str, None] = None,
-                 database: Union[str, None] = None) -> None:
+                 database: Union[str, None] = None,
+                 backend: Union[Backend, None] = None) -> None:
         logging.info("MongoAPI instance cretaed")
-        if host or uri:
-            self.connect_one(host=host, port=port, uri=uri, database=database)        
+        if host or uri or backend:
+            self.connect_one(host=host, port=port, uri=uri, database=database, backend=backend)        
+    
+    @staticmethod
+    def resolve_backend(uri: Union[str, None] = None, backend: Union[Backend, None] = None) -> Backend:
+        """Returns the backend to create the client with. The `memory://` uri scheme selects the in-memory backend.
+        """
+        if backend is not None:
+            return backend
+        if uri and uri.startswith("memory://"):
+            from mongodesu.backends.memory import default_memory_backend
+            return default_memory_backend
+        return PyMongoBackend()
     
     @classmethod
     def connect(cls, 
                 host: Union[str, None] = None, 
                 port: Union[int, None] = 27017,
                 uri: Union[str, None] = None,
-                database: Union[str, None] = None):
+                database: Union[str, None] = None,
+                backend: Union[Backend, None] = None):
         logging.info("Calling the class method connect")
-        if uri:
-            logging.info(f"Connecting with the URI: {uri}")
-            cls.client = MongoClient(host=uri)
-
-        if host:
-            logging.info(f"Connecting with the HOST: {host} and PORT: {port}")
-            cls.client = MongoClient(host=host, port=port)
-        
-        if database:
-                cls.db = cls.client.get_database(database)
-        else:
-            cls.db = cls.client.get_database()
+        client, db = cls.create_connection(host, port, uri, database, backend)
+        # The models only read the db, which is assigned last, and are bound again to the new db on their next operation
+        with _connect_lock:
+            cls.client = client
+            cls.db = db
             
-
-    
     def connect_one(self,
                 host: Union[str, None] = None, 
                 port: Union[int, None] = 27017,
                 uri: Union[str, None] = None,
-                database: Union[str, None] = None):
+                database: Union[str, None] = None,
+                backend: Union[Backend, None] = None):
         logging.info("Calling the instance method connect_one")
+        client, db = self.create_connection(host, port, uri, database, backend)
+        with _connect_lock:
+            self.client = client
+            self.db = db
+        logging.info(self.db)
+    
+    @classmethod
+    def create_connection(cls,
+                host: Union[str, None] = None, 
+                port: Union[int, None] = 27017,
+                uri: Union[str, None] = None,
+                database: Union[str, None] = None,
+                backend: Union[Backend, None] = None):
+        """Creates the client and gets the database, without binding them.
+
+        Returns:
+            Tuple: The client and the database
+        """
+        _backend = cls.resolve_backend(uri, backend)
         if uri:
             logging.info(f"Connecting with the URI: {uri}")
-            self.client = MongoClient(host=uri)
+            client = _backend.create_client(uri=uri)
 
         if host:
             logging.info(f"Connecting with the HOST: {host} and PORT: {port}")
-            self.client = MongoClient(host=host, port=port)
+            client = _backend.create_client(host=host, port=port)
+        
+        if not host and not uri:
+            logging.info(f"Connecting with the backend: {_backend.__class__.__name__}")
+            client = _backend.create_client()
         
         if database:
-                self.db = self.client.get_database(database)
+            db = client.get_database(database)
         else:
-            self.db = self.client.get_database()
-            logging.info(self.db)              
+            db = client.get_database()
+        return client, db
 
 
 
 ## NEW WAY TO DEFINE COLLECTION AND MODEL
 class Model(MongoAPI, Serializable):
     connection: Union[MongoAPI, None]
+    # When the `$jsonSchema` validator is applied on the collection with `apply_schema_validator`, the bulk writes
+    # and the updates are validated by the server instead of the client
+    server_validation: bool = False
+    # Routing of the operations, e.g. `read_preference = "secondaryPreferred"` for the models tolerating stale reads.
+    # The read operations accept the same options to override them per call
+    read_preference: Union[str, Any, None] = None
+    max_staleness: int = -1
+    tag_sets: Optional[List[Mapping[str, str]]] = None
+    read_concern: Union[str, Any, None] = None
+    write_concern: Union[Mapping[str, Any], Any, None] = None
+    # Opt-in write-behind, `insert_one` and `save` enqueue the validated documents into the buffer instead of writing them
+    write_behind: Optional[WriteBehindBuffer] = None
+    # Multi-tenant or sharded models select the database and collection of every operation with the router, see `Router`
+    router: Optional[Router] = None
+    # Opt-in cache of the `count_documents` results, invalidated on the writes of the model, see `CountCache`
+    count_cache: Optional[CountCache] = None
     
     def __init__(self, **kwargs) -> None:
-        if not hasattr(self, 'connection') or not self.connection:
-            if self.db is None:
-                super().__init__()
+        if self.router is None:
+            # The connection and the collection are resolved once per model class, see `ModelBinding`
+            binding = get_binding(self.__class__)
+            self.client = binding.client
+            self.db = binding.db
+            self.collection_name = binding.collection_name
+            self.collection = binding.collection
         else:
-            self.db = self.connection.db
-            self.client = self.connection.client
+            # The routed instances are bound to the route of their routing field on save
+            self.collection_name = resolve_collection_name(self.__class__)
             
         for key, value in kwargs.items():
             setattr(self, key, value)
-        # print(self.__class__.__dict__.items())
-        if (not hasattr(self, 'collection_name')) or self.collection_name is None or self.collection_name == '':
-            self.collection_name = self.construct_model_name() # Here I want to get the inherited class name as the collection name.
-            
-        self.collection = Collection(self.db, self.collection_name)
-        logging.info(self.collection)
-        # Create the collection in the mongo db with the field rules
-        items = self.__class__.__dict__.items()
-        for key, value in items:
-            if isinstance(value, Field):
-                ## Extract the rulw
-                kwargs = {}
-                if hasattr(value, 'unique') and getattr(value, 'unique') is True:
-                    kwargs['unique'] = getattr(value, 'unique')
-                if kwargs or (hasattr(value, 'index') and getattr(value, 'index') is True):
-                    self.collection.create_index(keys=key, **kwargs)
                     
                     
     @classmethod
@@ -119,11 +195,18 @@ class Model(MongoAPI, Serializable):
             # Cursor: The cursor object of the documents
             List[_DocumentType]: The list of model instances
         """
-        # cls.collection = getattr(cls, "collection", Collection(cls.db, cls.collection_name))
-        _current_self = cls()
-        cursor = _current_self.collection.find(*args, **kwargs)
+        options = split_routing(kwargs)
+        filter = args[0] if args else kwargs.get("filter")
+        bindings = cls.bindings_for(filter, scatter=True)
+        if len(bindings) == 1:
+            collection = bindings[0].collection_with(**options)
+            with track(cls, "find", filter, collection) as event:
+                docs = list(collection.find(*args, **kwargs))
+                event.set_result(len(docs), docs)
+        else:
+            docs = cls._gather_find(bindings, filter, options, args, kwargs)
         resulted_list: List[M] = []
-        for doc in cursor:
+        for doc in docs:
             instance = cls(**doc)
             resulted_list.append(instance)
             
@@ -139,9 +222,24 @@ class Model(MongoAPI, Serializable):
         Returns:
             Cursor: The cursor object of the document returned
         """
-        # cls.collection = getattr(cls, "collection", Collection(cls.db, cls.collection_name))
-        _current_self = cls()
-        data = _current_self.collection.find_one(filter, *args, **kwargs)
+        options = split_routing(kwargs)
+        
+        def run(binding: ModelBinding):
+            collection = binding.collection_with(**options)
+            with track(cls, "find_one", filter, collection) as event:
+                data = collection.find_one(filter, *args, **kwargs)
+                event.set_result(0 if data is None else 1, [] if data is None else [data])
+            return data
+        
+        bindings = cls.bindings_for(filter if isinstance(filter, abc.Mapping) else None, scatter=True)
+        if len(bindings) == 1:
+            data = run(bindings[0])
+        else:
+            # Scatter-gather, the first of the merged documents in the `sort` and `skip` order is returned
+            if filter is not None and not isinstance(filter, abc.Mapping):
+                filter = {"_id": filter}
+            docs = cls._gather_find(bindings, filter, options, (filter, *args), dict(kwargs, limit=1), "find_one")
+            data = docs[0] if docs else None
         if data is None:
             return data
         return cls(**data) # Return the class instance
@@ -166,7 +264,8 @@ class Model(MongoAPI, Serializable):
         Args:
             documents (Iterable[Union[_DocumentType, RawBSONDocument]]): The List of dictionary or RawBOSN type document to insert
             ordered (bool, optional): Flag to weather enable the ordered insertion. Defaults to True.
-            bypass_document_validation (bool, optional): Flag to disable the validation check. The validation check is defined in the fields of the model. Defaults to False.
+            bypass_document_validation (bool, optional): Flag to disable the validation check. The validation check is defined in the fields of the model. 
+                With `server_validation` the documents are validated by the server only, the client fills the defaults. Defaults to False.
             session (Union[ClientSession, None], optional): The transaction session of the mongodb. Defaults to None.
             comment (Union[Any, None], optional): An user defined comment attached to this command. Defaults to None.
 
@@ -176,16 +275,44 @@ class Model(MongoAPI, Serializable):
         Returns:
             InsertManyResult: An instance of the `InsertManyResult`
         """
-        _current_self = cls()
+        _current_self = cls() # Holds the values of the document being validated, one instance per call
         if not isinstance(documents, abc.Iterable):
             raise ValueError('documents should be an iterable of raybson or documenttype')
         
         _data = documents
         
         if bypass_document_validation is False:
-            _data = _current_self.validate_on_docs(documents)
+            if cls.server_validation:
+                _data = [_current_self.fill_defaults(doc) for doc in documents]
+            else:
+                _data = _current_self.validate_on_docs(documents)
         
-        return _current_self.collection.insert_many(_data, ordered, bypass_document_validation, session, comment)
+        if cls.router is not None:
+            return cls._insert_routed(list(_data), ordered, bypass_document_validation, session, comment)
+        collection = get_binding(cls).collection
+        with track(cls, "insert_many", None, collection) as event, invalidating(cls, collection):
+            result = collection.insert_many(_data, ordered, bypass_document_validation, session, comment)
+            event.set_result(len(result.inserted_ids), _data)
+        return result
+    
+    @classmethod
+    def _insert_routed(cls, documents: List[Any], ordered: bool, bypass_document_validation: bool,
+                       session: Optional[ClientSession], comment: Optional[Any]) -> InsertManyResult:
+        """Partitions the documents by route and inserts the partitions concurrently, `ordered` applies per route."""
+        from pymongo.results import InsertManyResult
+        
+        def run(partition):
+            route, indexes = partition
+            collection = route.binding(cls).collection
+            batch = [documents[index] for index in indexes]
+            with track(cls, "insert_many", None, collection) as event, invalidating(cls, collection):
+                result = collection.insert_many(batch, ordered, bypass_document_validation, session, comment)
+                event.set_result(len(result.inserted_ids), batch)
+            return result
+        
+        results = cls.router.scatter(run, cls.router.partition(documents))
+        # The ids are set on the documents on insert, they are returned in the order of the documents
+        return InsertManyResult([document['_id'] for document in documents], all(result.acknowledged for result in results))
     
     @classmethod
     def insert_one(cls: Type[M], document: Union[Any, RawBSONDocument], bypass_document_validation: bool = False, 
@@ -199,13 +326,22 @@ class Model(MongoAPI, Serializable):
             comment (Union[Any, None], optional): An user defined comment attached to the command. Defaults to None.
 
         Returns:
-            InsertOneResult: The instance of the `InsertOneResult`
+            InsertOneResult: The instance of the `InsertOneResult`, not acknowledged if the model has a `write_behind` buffer
         """
-        _current_self = cls()
         _data = document
         if bypass_document_validation is False:
-            _data = _current_self.validate_on_docs(data=document)
-        return _current_self.collection.insert_one(_data, bypass_document_validation, session, comment)
+            _data = cls().validate_on_docs(data=document)
+        collection = cls.collection_for(_data)
+        if cls.write_behind is not None:
+            inserted = cls.write_behind.enqueue(cls, collection, dict(_data))
+            # The buffer holds a copy, the id is set on the document like the insert of pymongo does
+            if isinstance(document, abc.MutableMapping) and '_id' not in document:
+                document['_id'] = inserted.inserted_id
+            return inserted
+        with track(cls, "insert_one", None, collection) as event, invalidating(cls, collection):
+            result = collection.insert_one(_data, bypass_document_validation, session, comment)
+            event.set_result(1, [_data])
+        return result
     
     @classmethod
     def update_one(
@@ -213,7 +349,7 @@ class Model(MongoAPI, Serializable):
         filter: Mapping[str, Any],
         update: Union[Mapping[str, Any], _Pipeline],
         upsert: bool = False,
-        bypass_document_validation: bool = True, # This will be true as in case of update we will not provide all the fields
+        bypass_document_validation: Optional[bool] = None, # Bypassed unless server_validation, as in case of update we will not provide all the fields
         collation: Union[_CollationIn, None] = None,
         array_filters: Union[Sequence[Mapping[str, Any]], None] = None,
         hint: Union[_IndexKeyHint, None] = None,
@@ -227,7 +363,8 @@ class Model(MongoAPI, Serializable):
             filter (Mapping[str, Any]): The filter to add to the query
             update (Union[Mapping[str, Any], _Pipeline]): the data to be updated in the document
             upsert (bool, optional): If set to true then if no data is found then a new document will be created. Defaults to False.
-            bypass_document_validation (bool, optional): If set to true to disable the validation check on the data. Defaults to False.
+            bypass_document_validation (Optional[bool], optional): If set to true to disable the validation check on the data. 
+                Defaults to None, which bypasses the validation unless the model has `server_validation` set, then the server validates the updated documents.
             collation (Union[_CollationIn, None], optional): _description_. Defaults to None.
             array_filters (Union[Sequence[Mapping[str, Any]], None], optional): _description_. Defaults to None.
             hint (Union[_IndexKeyHint, None], optional): _description_. Defaults to None.
@@ -238,11 +375,16 @@ class Model(MongoAPI, Serializable):
         Returns:
             UpdateResult: _description_
         """
-        _current_self = cls()
+        collection = cls.collection_for(filter)
         _data = update
-        if bypass_document_validation is False:
-            _data = _current_self.validate_on_docs(data=update)
-        return _current_self.collection.update_one(filter, _data, upsert, bypass_document_validation, collation, array_filters, hint, session, let, comment)
+        if bypass_document_validation is None:
+            bypass_document_validation = not cls.server_validation
+        if bypass_document_validation is False and not cls.server_validation:
+            _data = cls().validate_on_docs(data=update)
+        with track(cls, "update_one", filter, collection) as event, invalidating(cls, collection):
+            result = collection.update_one(filter, _data, upsert, bypass_document_validation, collation, array_filters, hint, session, let, comment)
+            event.set_result(result.modified_count + (1 if result.upserted_id is not None else 0))
+        return result
 
     @classmethod
     def update_many(
@@ -251,18 +393,23 @@ class Model(MongoAPI, Serializable):
         update: Union[Mapping[str, Any], _Pipeline],
         upsert: bool = False,
         array_filters: Optional[Sequence[Mapping[str, Any]]] = None,
-        bypass_document_validation: Optional[bool] = True,
+        bypass_document_validation: Optional[bool] = None,
         collation: Optional[_CollationIn] = None,
         hint: Optional[_IndexKeyHint] = None,
         session: Optional[ClientSession] = None,
         let: Optional[Mapping[str, Any]] = None,
         comment: Optional[Any] = None,
     ) -> UpdateResult:
-        _current_self = cls()
+        collection = cls.collection_for(filter)
         _data = update
-        if bypass_document_validation is False:
-            _data = _current_self.validate_on_docs(update)
-        return _current_self.collection.update_many(filter, _data, upsert, array_filters, bypass_document_validation, collation, hint, session, let, comment)
+        if bypass_document_validation is None:
+            bypass_document_validation = not cls.server_validation
+        if bypass_document_validation is False and not cls.server_validation:
+            _data = cls().validate_on_docs(update)
+        with track(cls, "update_many", filter, collection) as event, invalidating(cls, collection):
+            result = collection.update_many(filter, _data, upsert, array_filters, bypass_document_validation, collation, hint, session, let, comment)
+            event.set_result(result.modified_count + (1 if result.upserted_id is not None else 0))
+        return result
 
     @classmethod
     def delete_one(
@@ -274,8 +421,11 @@ class Model(MongoAPI, Serializable):
         let: Optional[Mapping[str, Any]] = None,
         comment: Optional[Any] = None,
     ) -> DeleteResult:
-        cls.collection = getattr(cls, "collection", Collection(cls.db, cls.collection_name))
-        return cls.collection.delete_one(filter, collation, hint, session, let, comment)
+        collection = cls.collection_for(filter)
+        with track(cls, "delete_one", filter, collection) as event, invalidating(cls, collection):
+            result = collection.delete_one(filter, collation, hint, session, let, comment)
+            event.set_result(result.deleted_count)
+        return result
     
     @classmethod
     def delete_many(
@@ -287,8 +437,11 @@ class Model(MongoAPI, Serializable):
         let: Optional[Mapping[str, Any]] = None,
         comment: Optional[Any] = None,
     ) -> DeleteResult:
-        cls.collection = getattr(cls, "collection", Collection(cls.db, cls.collection_name))
-        return cls.collection.delete_many(filter, collation, hint, session, let, comment)
+        collection = cls.collection_for(filter)
+        with track(cls, "delete_many", filter, collection) as event, invalidating(cls, collection):
+            result = collection.delete_many(filter, collation, hint, session, let, comment)
+            event.set_result(result.deleted_count)
+        return result
     
     @classmethod
     def aggregate(cls: Type[M],
@@ -298,8 +451,10 @@ class Model(MongoAPI, Serializable):
         comment: Optional[Any] = None,
         **kwargs: Any,
     ) -> CommandCursor[_DocumentType]:
-        cls.collection = getattr(cls, "collection", Collection(cls.db, cls.collection_name))
-        return cls.collection.aggregate(pipeline, session, let, comment, **kwargs)
+        collection = cls.collection_for(pipeline[0].get("$match") if pipeline else None, **split_routing(kwargs))
+        # The cursor is consumed by the caller, so only the time to open the cursor is tracked
+        with track(cls, "aggregate", pipeline[0].get("$match") if pipeline else None, collection):
+            return collection.aggregate(pipeline, session, let, comment, **kwargs)
     
     @classmethod
     def count_documents(
@@ -309,8 +464,266 @@ class Model(MongoAPI, Serializable):
         comment: Optional[Any] = None,
         **kwargs: Any,
         )-> int:
-        cls.collection = getattr(cls, "collection", Collection(cls.db, cls.collection_name))
-        return cls.collection.count_documents(filter=filter, session=session, comment=comment, **kwargs)
+        """Exact count of the documents matching the filter. With the `count_cache` of the model the counts
+        are cached per filter and options, the counts in a session are not cached.
+
+        Returns:
+            int: The number of the documents
+        """
+        options = split_routing(kwargs)
+        cache = cls.count_cache if session is None else None
+        key = query_key(filter, options, kwargs) if cache is not None else None
+        
+        def count(binding: ModelBinding) -> int:
+            collection = binding.collection_with(**options)
+            with track(cls, "count_documents", filter, collection) as event:
+                count = collection.count_documents(filter=filter, session=session, comment=comment, **kwargs)
+                event.set_result(count)
+            return count
+        
+        def run(binding: ModelBinding) -> int:
+            if cache is None:
+                return count(binding)
+            return cache.get(binding.db, binding.collection_name, key, lambda: count(binding))
+        
+        bindings = cls.bindings_for(filter, scatter=True)
+        if len(bindings) == 1:
+            return run(bindings[0])
+        return sum(cls.router.scatter(run, bindings))
+    
+    @classmethod
+    def estimated_count(cls: Type[M], **kwargs: Any) -> int:
+        """Count of all the documents of the collection from its metadata, without scanning the collection or an index.
+        The count can be off after an unclean shutdown, or with the orphaned documents of a sharded cluster.
+
+            >>> Order.estimated_count(maxTimeMS=1000)
+
+        Args:
+            kwargs: The routing options, the other options are passed to `estimated_document_count`.
+
+        Returns:
+            int: The estimated number of the documents, summed over the routes of a routed model
+        """
+        options = split_routing(kwargs)
+        
+        def run(binding: ModelBinding) -> int:
+            collection = binding.collection_with(**options)
+            with track(cls, "estimated_count", None, collection) as event:
+                count = collection.estimated_document_count(**kwargs)
+                event.set_result(count)
+            return count
+        
+        bindings = cls.bindings_for(None, scatter=True)
+        if len(bindings) == 1:
+            return run(bindings[0])
+        return sum(cls.router.scatter(run, bindings))
+    
+    @classmethod
+    def export_ndjson(
+        cls: Type[M],
+        filter: Optional[Mapping[str, Any]] = None,
+        stream: Any = None,
+        batch_size: int = 1000,
+        fast: bool = True,
+        **kwargs: Any,
+    ) -> int:
+        """Streams the documents matching the filter to the stream as newline delimited json, without hydrating the
+        models or holding the results in memory. Every line has the same fields as `to_dict`.
+
+            >>> with open("users.ndjson", "wb") as file:
+            ...     User.export_ndjson({"is_active": True}, file)
+
+        Args:
+            filter (Optional[Mapping[str, Any]], optional): The filter of the documents to export. Defaults to None.
+            stream (Any): A binary or text file-like object, or a socket.
+            batch_size (int, optional): The number of documents fetched and written at once. Defaults to 1000.
+            fast (bool, optional): Use `orjson` to encode if it is installed. Defaults to True.
+            kwargs: Passed to the `find` of the collection, e.g. `sort`.
+
+        Returns:
+            int: The number of documents written.
+        """
+        if stream is None:
+            raise ValueError('stream should be a file-like object or a socket.')
+        encoder = get_encoder(cls)
+        collection = cls.collection_for(filter, **split_routing(kwargs))
+        with track(cls, "export_ndjson", filter, collection) as event:
+            cursor = collection.find(filter, projection=encoder.projection, batch_size=batch_size, **kwargs)
+            count = export_ndjson(encoder, cursor, stream, batch_size, fast)
+            event.set_result(count)
+        return count
+    
+    @classmethod
+    def watch(
+        cls: Type[M],
+        pipeline: Optional[List[Mapping[str, Any]]] = None,
+        fields: Optional[Sequence[str]] = None,
+        full_document: Optional[str] = "updateLookup",
+        token_store: Optional[ResumeTokenStore] = None,
+        name: Optional[str] = None,
+        on_change: Sequence[Callable[[ChangeEvent[M]], Any]] = (),
+        **kwargs: Any,
+    ) -> ModelChangeStream[M]:
+        """Subscribe to the changes of the model collection through a change stream. Requires a replica set.
+
+            >>> with User.watch(pipeline=[{"$match": {"operationType": "insert"}}], fields=["email"]) as stream:
+            ...     for event in stream:
+            ...         send_welcome_mail(event.instance.email)
+
+        Args:
+            pipeline (Optional[List[Mapping[str, Any]]], optional): Aggregation stages to filter the changes on the server. Defaults to None.
+            fields (Optional[Sequence[str]], optional): Only these fields of the documents are returned and hydrated. Defaults to all.
+            full_document (Optional[str], optional): The `full_document` option of the change stream. Defaults to "updateLookup".
+            token_store (Optional[ResumeTokenStore], optional): Store of the resume token, to continue from the last processed change after a restart. Defaults to None.
+            name (Optional[str], optional): The name of the subscription in the token store. Defaults to the collection name.
+            on_change (Sequence[Callable[[ChangeEvent[M]], Any]], optional): Callbacks called with every change, e.g. to invalidate the caches of the model. Defaults to ().
+            kwargs: Passed to the `watch` of the collection, e.g. `max_await_time_ms`, `batch_size`.
+
+        Returns:
+            ModelChangeStream[M]: The subscription, iterate it for the `ChangeEvent`s or use its `batches`.
+        """
+        return ModelChangeStream(cls, cls.collection_for(None), pipeline, fields, full_document, token_store, name,
+                                 on_change, **kwargs)
+    
+    @classmethod
+    def json_schema(cls) -> Dict[str, Any]:
+        """The `$jsonSchema` of the model built from its fields, the required fields, the types, the sizes and the enums.
+
+            >>> User.json_schema()
+            {'bsonType': 'object', 'required': ['name'], 'properties': {'name': {'bsonType': 'string', 'minLength': 1, 'maxLength': 100}, ...}}
+
+        Returns:
+            Dict[str, Any]: The schema to use in the `{"$jsonSchema": ...}` validator of the collection
+        """
+        required = []
+        properties = {}
+        for key, field in declared_fields(cls).items():
+            properties[key] = field.json_schema()
+            if getattr(field, 'required', False):
+                required.append(key)
+        schema: Dict[str, Any] = {"bsonType": "object"}
+        if required:
+            schema["required"] = required
+        schema["properties"] = properties
+        return schema
+    
+    @classmethod
+    def apply_schema_validator(cls, validation_level: str = "strict", validation_action: str = "error") -> Mapping[str, Any]:
+        """Applies the `$jsonSchema` of the model as the validator of the collection with `collMod`,
+        the collection is created with the validator if it does not exist.
+
+        Args:
+            validation_level (str, optional): `strict`, `moderate` or `off`. Defaults to "strict".
+            validation_action (str, optional): `error` to reject the invalid documents or `warn` to only log them. Defaults to "error".
+
+        Returns:
+            Mapping[str, Any]: The response of the command
+        """
+        from pymongo.errors import OperationFailure
+        
+        options = {"validator": {"$jsonSchema": cls.json_schema()}, "validationLevel": validation_level,
+                   "validationAction": validation_action}
+        response: Mapping[str, Any] = {"ok": 1.0}
+        # The validator is applied on every route of the routed models
+        for binding in cls.bindings_for(None, scatter=True):
+            try:
+                response = binding.db.command("collMod", binding.collection_name, **options)
+            except OperationFailure as error:
+                if error.code != 26: # NamespaceNotFound
+                    raise
+                binding.db.create_collection(binding.collection_name, **options)
+                response = {"ok": 1.0}
+        return response
+    
+    @classmethod
+    def routed_collection(cls, **options: Any) -> Collection:
+        """The collection handle with the routing options of the call over the routing of the model.
+        The handles are cached per routing, the collection of the model is returned if no option is given.
+
+            >>> User.routed_collection(read_preference="secondary", tag_sets=[{"dc": "eu"}])
+
+        Args:
+            **options: `read_preference`, `max_staleness`, `tag_sets`, `read_concern` and `write_concern`.
+
+        Returns:
+            Collection: The collection handle
+        """
+        return cls.collection_for(None, **options)
+    
+    @classmethod
+    def bindings_for(cls, filter: Optional[Mapping[str, Any]] = None, scatter: bool = False) -> List[ModelBinding]:
+        """The bindings the operation with the filter runs on, the binding of the model unless it has a `router`.
+
+        Args:
+            filter (Optional[Mapping[str, Any]], optional): The filter, or the document, to route. Defaults to None.
+            scatter (bool, optional): Returns all the routes if the filter does not have the routing field. Defaults to False.
+
+        Raises:
+            ValueError: If the filter does not have the routing field and not `scatter`.
+        """
+        if cls.router is None:
+            return [get_binding(cls)]
+        # The routes of the tenants sharing a database, e.g. pooled tenants, are run on their collection once
+        bindings: Dict[Any, ModelBinding] = {}
+        for route in cls.router.routes_for(filter, scatter):
+            binding = route.binding(cls)
+            bindings.setdefault((binding.db, binding.collection_name), binding)
+        return list(bindings.values())
+    
+    @classmethod
+    def collection_for(cls, filter: Optional[Mapping[str, Any]] = None, **options: Any) -> Collection:
+        """The collection handle of the route of the filter, or the document, with the routing options over the routing of the model.
+
+            >>> Invoice.collection_for({"tenant_id": "acme"}, read_preference="secondary")
+
+        Raises:
+            ValueError: If the model has a `router` and the filter is not routed to exactly one route.
+        """
+        bindings = cls.bindings_for(filter)
+        if len(bindings) != 1:
+            raise ValueError(f"The operation on {cls.__name__} should be routed to one route, got {len(bindings)}.")
+        return bindings[0].collection_with(**options)
+    
+    @classmethod
+    def _gather_find(cls, bindings: List[ModelBinding], filter: Any, options: Dict[str, Any], args: tuple,
+                     kwargs: Dict[str, Any], operation: str = "find") -> List[Any]:
+        """Runs the find on the routes concurrently and merges the documents, the `sort`, `skip` and `limit`
+        apply to the merged documents."""
+        if len(args) > len(FIND_ARGUMENTS):
+            raise TypeError(f"find takes at most {len(FIND_ARGUMENTS)} positional arguments.")
+        # The positional arguments are passed by name, so the paging given positionally is not run per route
+        positional = dict(zip(FIND_ARGUMENTS, args))
+        for name in positional.keys() & kwargs.keys():
+            raise TypeError(f"find got multiple values for the argument {name!r}.")
+        kwargs = {**positional, **kwargs}
+        args = ()
+        skip = kwargs.pop("skip", 0)
+        limit = kwargs.pop("limit", 0)
+        if limit:
+            kwargs["limit"] = skip + limit
+        
+        def run(binding: ModelBinding) -> List[Any]:
+            collection = binding.collection_with(**options)
+            with track(cls, operation, filter, collection) as event:
+                docs = list(collection.find(*args, **kwargs))
+                event.set_result(len(docs), docs)
+            return docs
+        
+        docs = [doc for docs in cls.router.scatter(run, bindings) for doc in docs]
+        if kwargs.get("sort") is not None:
+            docs = sort_documents(docs, normalize_sort(kwargs["sort"]))
+        docs = docs[skip:]
+        return docs[:limit] if limit else docs
+    
+    def fill_defaults(self, data):
+        """The document with the defaults of the missing fields, without validating it. Used when the server validates the documents.
+        The keys which are not fields are kept."""
+        _data = dict(data)
+        for key, value in declared_fields(self.__class__).items():
+            if _data.get(key) is None:
+                default = getattr(value, 'default', None)
+                _data[key] = default() if isfunction(default) else default
+        return _data
     
     def validate_on_docs(self, data):
         _data = list()
@@ -361,38 +774,35 @@ class Model(MongoAPI, Serializable):
         if not data:
             raise ValueError('No value provided.')
         
+        # The routed instances are saved to the route of their routing field
+        collection = self.collection if self.router is None else self.__class__.collection_for(data)
         # New fix for calling save on the existing instance will update the record 
         if hasattr(self, '_id'):
             filter = {'_id': getattr(self, '_id')}
             # Calls to the update_on on the collection to keep the flow intact from class method
-            updated = self.collection.update_one(filter, {"$set": data}, upsert=False, bypass_document_validation=False)
+            with track(self.__class__, "save", filter, collection) as event, invalidating(self.__class__, collection):
+                updated = collection.update_one(filter, {"$set": data}, upsert=False, bypass_document_validation=False)
+                event.set_result(updated.modified_count, [data])
             return updated
+        if self.write_behind is not None:
+            inserted = self.write_behind.enqueue(self.__class__, collection, data)
+            setattr(self, '_id', inserted.inserted_id)
+            return inserted
         # Calling the insert_one on the collection itself not the classmethod to keep the reference from breaking
-        inserted = self.collection.insert_one(document=data)
+        with track(self.__class__, "save", None, collection) as event, invalidating(self.__class__, collection):
+            inserted = collection.insert_one(document=data)
+            event.set_result(1, [data])
         setattr(self, '_id', inserted.inserted_id)
         return inserted # This will return the mongo inserted result instance. But after updating the current instance
         
     
     def construct_model_name(self):
-        inflector = inflect.engine()
-        class_name = self.__class__.__name__
-        return inflector.plural(class_name.lower())
+        return pluralize(self.__class__.__name__)
     
     # Feature Implementation toDict
     def to_dict(self):
-        data = {}
-        for key, value in self.__class__.__dict__.items():
-            if isinstance(value, Field):
-                if hasattr(self, key):
-                    data[key] = getattr(self, key)
-                else:
-                    if hasattr(value, 'default'):
-                        data[key] = getattr(value, 'default')
-                    else:
-                        data[key] = None
-        if hasattr(self, '_id'):
-            data['_id'] = getattr(self, '_id')
-        return data
+        # The encoder has the field names of the class compiled, instead of walking the class attributes every call
+        return get_encoder(self.__class__).encode_instance(self)
     
     def __str__(self):
         return super().__str__() + " " + str(self.to_dict())
@@ -0,0 +1,14 @@
+from .options import Routing, ROUTING_OPTIONS, routed_collection, clear_routed_collections, split_routing
+from .router import Route, Router, TenantRouter, HashRouter
+
+__all__ = [
+    "Routing",
+    "ROUTING_OPTIONS",
+    "routed_collection",
+    "clear_routed_collections",
+    "split_routing",
+    "Route",
+    "Router",
+    "TenantRouter",
+    "HashRouter"
+]
@@ -0,0 +1,110 @@
+"""
+Sorting of the documents in the comparison order of the server, used to merge the documents returned by the routes
+of a scatter-gather `find`, and by the in-memory backend. The bson types are recognized by name, so this module
+does not load pymongo.
+"""
+import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# The rank of the bson types in the comparison and sort order of the server, the values of different
+# types are ordered by the rank of their types
+_NULL, _NUMBER, _STRING, _OBJECT, _ARRAY, _BINARY, _OBJECT_ID, _BOOLEAN, _DATE, _TIMESTAMP, _REGEX = range(1, 12)
+_MIN_KEY, _MAX_KEY = 0, 12
+_BSON_RANKS = {"MinKey": _MIN_KEY, "MaxKey": _MAX_KEY, "Int64": _NUMBER, "Decimal128": _NUMBER, "Binary": _BINARY,
+               "ObjectId": _OBJECT_ID, "Timestamp": _TIMESTAMP, "Regex": _REGEX, "Pattern": _REGEX, "Code": _STRING}
+
+
+def _resolve(value: Any, parts: List[str]) -> List[Any]:
+    """Resolve a dotted path against a document, expanding the arrays in the path like mongodb does."""
+    if not parts:
+        return [value]
+    key, rest = parts[0], parts[1:]
+    if isinstance(value, Mapping):
+        if key in value:
+            return _resolve(value[key], rest)
+        return []
+    if isinstance(value, list):
+        if key.isdigit():
+            index = int(key)
+            return _resolve(value[index], rest) if index < len(value) else []
+        found: List[Any] = []
+        for item in value:
+            if isinstance(item, (Mapping, list)):
+                found.extend(_resolve(item, parts))
+        return found
+    return []
+
+
+def get_values(doc: Mapping[str, Any], path: str) -> List[Any]:
+    return _resolve(doc, path.split("."))
+
+
+def bson_type_rank(value: Any) -> int:
+    """The rank of the bson type of the value in the comparison order of the server."""
+    if value is None:
+        return _NULL
+    if isinstance(value, bool):
+        return _BOOLEAN
+    if isinstance(value, (int, float)):
+        return _NUMBER
+    if isinstance(value, str):
+        return _STRING
+    if isinstance(value, Mapping):
+        return _OBJECT
+    if isinstance(value, list):
+        return _ARRAY
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return _DATE
+    rank = _BSON_RANKS.get(type(value).__name__)
+    if rank is not None:
+        return rank
+    if isinstance(value, (bytes, bytearray)):
+        return _BINARY
+    return _MAX_KEY
+
+
+def sort_key(value: Any, direction: int = 1) -> Tuple[int, Any]:
+    """The key to sort the values in the order of the server. An array is sorted by its smallest item ascending
+    and by its largest item descending."""
+    if isinstance(value, list):
+        if not value:
+            return (_NULL, 0)
+        pick = min if direction == 1 else max
+        value = pick(value, key=sort_key)
+    rank = bson_type_rank(value)
+    if value is None or rank in (_MIN_KEY, _MAX_KEY):
+        return (rank, 0)
+    if rank == _NUMBER and hasattr(value, "to_decimal"): # Decimal128
+        return (rank, value.to_decimal())
+    if rank == _OBJECT:
+        return (rank, str(value))
+    if rank == _DATE and not isinstance(value, datetime.datetime):
+        return (rank, datetime.datetime(value.year, value.month, value.day))
+    if rank == _DATE and value.tzinfo is not None:
+        return (rank, value.astimezone(datetime.timezone.utc).replace(tzinfo=None))
+    if rank == _TIMESTAMP:
+        return (rank, (value.time, value.inc))
+    if rank == _REGEX:
+        return (rank, value.pattern)
+    return (rank, value)
+
+
+def normalize_sort(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    """The sort specification of `find` or `$sort` as a list of (key, direction)."""
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, Mapping):
+        return list(key_or_list.items())
+    return [(item, 1) if isinstance(item, str) else (item[0], item[1]) for item in key_or_list]
+
+
+def sort_documents(docs: List[Dict[str, Any]], spec: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    """The documents sorted by the (key, direction) specification, the sort is stable."""
+    for key, direction in reversed(spec):
+        def value_key(doc: Mapping[str, Any], key: str = key, direction: int = direction) -> Tuple[int, Any]:
+            values = get_values(doc, key)
+            return sort_key(values if len(values) != 1 else values[0], direction)
+        docs = sorted(docs, key=value_key, reverse=direction == -1)
+    return docs
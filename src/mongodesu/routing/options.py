@@ -0,0 +1,149 @@
+import threading
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+from weakref import WeakKeyDictionary
+
+# The options of the routing, declared on the model class or passed to the read operations
+ROUTING_OPTIONS = ("read_preference", "max_staleness", "tag_sets", "read_concern", "write_concern")
+
+# The read preference mode names of the pymongo read preference classes
+READ_PREFERENCE_MODES = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+
+
+class Routing:
+    """
+    The read preference, read concern and write concern of the collection handle an operation runs with.
+    The options are normalized to plain values, so the routings are compared and cached by their `key`.
+
+        >>> Routing(read_preference="secondaryPreferred", max_staleness=120, tag_sets=[{"dc": "eu"}])
+
+    Args:
+        read_preference (Union[str, Any, None], optional): The mode name, e.g. `secondaryPreferred`,
+            or a pymongo read preference. Defaults to None, the read preference of the database.
+        max_staleness (int, optional): The maximum replication lag in seconds of the secondaries to read from. Defaults to -1, no maximum.
+        tag_sets (Optional[Sequence[Mapping[str, str]]], optional): The tag sets of the members to read from. Defaults to None.
+        read_concern (Union[str, Any, None], optional): The read concern level, e.g. `majority`, or a pymongo `ReadConcern`. Defaults to None.
+        write_concern (Union[Mapping[str, Any], Any, None], optional): The write concern options, e.g. `{"w": "majority"}`,
+            or a pymongo `WriteConcern`. Defaults to None.
+    """
+
+    def __init__(self,
+                 read_preference: Union[str, Any, None] = None,
+                 max_staleness: int = -1,
+                 tag_sets: Optional[Sequence[Mapping[str, str]]] = None,
+                 read_concern: Union[str, Any, None] = None,
+                 write_concern: Union[Mapping[str, Any], Any, None] = None) -> None:
+        if read_preference is not None and not isinstance(read_preference, str):
+            # A pymongo read preference, its tag sets and max staleness are used unless given
+            if tag_sets is None and getattr(read_preference, 'tag_sets', None) not in (None, [{}]):
+                tag_sets = read_preference.tag_sets
+            if max_staleness == -1:
+                max_staleness = getattr(read_preference, 'max_staleness', -1)
+            read_preference = read_preference.mongos_mode
+        if read_preference is not None and read_preference not in READ_PREFERENCE_MODES:
+            raise ValueError(f"read_preference should be one of {READ_PREFERENCE_MODES}.")
+        if read_preference == "primary" and (tag_sets or max_staleness != -1):
+            raise ValueError("tag_sets and max_staleness can not be used with the primary read preference.")
+        if read_concern is not None and not isinstance(read_concern, str):
+            read_concern = read_concern.level
+        if write_concern is not None and not isinstance(write_concern, Mapping):
+            write_concern = write_concern.document
+
+        self.read_preference: Optional[str] = read_preference
+        self.max_staleness = max_staleness
+        self.tag_sets: Optional[List[Dict[str, str]]] = [dict(tags) for tags in tag_sets] if tag_sets else None
+        self.read_concern: Optional[str] = read_concern
+        self.write_concern: Optional[Dict[str, Any]] = dict(write_concern) if write_concern is not None else None
+        self.key: Hashable = (
+            self.read_preference,
+            self.max_staleness,
+            tuple(tuple(sorted(tags.items())) for tags in self.tag_sets) if self.tag_sets else None,
+            self.read_concern,
+            tuple(sorted(self.write_concern.items())) if self.write_concern is not None else None,
+        )
+
+    @classmethod
+    def from_model(cls, model: type) -> "Routing":
+        """The routing declared with the `read_preference`, `max_staleness`, `tag_sets`, `read_concern` and
+        `write_concern` attributes of the model class."""
+        return cls(**{name: getattr(model, name) for name in ROUTING_OPTIONS if getattr(model, name, None) is not None})
+
+    def merge(self, **overrides: Any) -> "Routing":
+        """A routing with the options overridden, the None values are ignored."""
+        options = {name: getattr(self, name) for name in ROUTING_OPTIONS}
+        read_preference = overrides.get("read_preference")
+        if read_preference is not None and (not isinstance(read_preference, str) or read_preference == "primary"):
+            # The tag sets and max staleness come with the pymongo read preference, and do not apply to the primary
+            options["tag_sets"], options["max_staleness"] = None, -1
+        options.update({name: value for name, value in overrides.items() if value is not None})
+        return Routing(**options)
+
+    @property
+    def is_default(self) -> bool:
+        return self.key == (None, -1, None, None, None)
+
+    def collection_options(self) -> Dict[str, Any]:
+        """The pymongo options of `Database.get_collection` for the routing."""
+        options: Dict[str, Any] = {}
+        if self.read_preference is not None or self.tag_sets or self.max_staleness != -1:
+            from pymongo import read_preferences
+
+            mode = self.read_preference or "secondaryPreferred"
+            preference = getattr(read_preferences, mode[0].upper() + mode[1:])
+            if mode == "primary":
+                options["read_preference"] = preference()
+            else:
+                options["read_preference"] = preference(tag_sets=self.tag_sets, max_staleness=self.max_staleness)
+        if self.read_concern is not None:
+            from pymongo.read_concern import ReadConcern
+
+            options["read_concern"] = ReadConcern(self.read_concern)
+        if self.write_concern is not None:
+            from pymongo.write_concern import WriteConcern
+
+            options["write_concern"] = WriteConcern(**self.write_concern)
+        return options
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Routing) and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        options = ", ".join(f"{name}={getattr(self, name)!r}" for name in ROUTING_OPTIONS
+                            if getattr(self, name) not in (None, -1))
+        return f"Routing({options})"
+
+
+def split_routing(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Pops the routing options from the keyword arguments of an operation."""
+    return {name: kwargs.pop(name) for name in ROUTING_OPTIONS if name in kwargs}
+
+
+_lock = threading.Lock()
+# The collection handles of the routings, per database and collection name
+_handles: "WeakKeyDictionary[Any, Dict[Tuple[str, Hashable], Any]]" = WeakKeyDictionary()
+
+
+def routed_collection(database: Any, name: str, routing: Routing) -> Any:
+    """
+    The handle of the collection with the routing options. The handles are cached per database, collection name
+    and routing, creating a handle resolves the read preference, read concern and write concern every time.
+    """
+    key = (name, routing.key)
+    handles = _handles.get(database)
+    if handles is not None:
+        collection = handles.get(key)
+        if collection is not None:
+            return collection
+    with _lock:
+        handles = _handles.setdefault(database, {})
+        collection = handles.get(key)
+        if collection is None:
+            collection = handles[key] = database.get_collection(name, **routing.collection_options())
+        return collection
+
+
+def clear_routed_collections() -> None:
+    with _lock:
+        _handles.clear()
@@ -0,0 +1,275 @@
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar, Union, TYPE_CHECKING
+from weakref import WeakKeyDictionary
+
+from mongodesu.binding.binding import ModelBinding, resolve_collection_name
+from mongodesu.routing.options import ROUTING_OPTIONS
+
+if TYPE_CHECKING:
+    from mongodesu.mongolib import Model, MongoAPI
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class Route:
+    """
+    A database and collection the documents of a routed model are stored in. The route is immutable,
+    the bindings of the models are cached on the route and their indexes are created once.
+    The database is resolved from the connection on every operation, so the route can be declared before
+    the connection is connected, and a connection connected again is used on the next operation.
+
+        >>> Route(eu_cluster, database="tenant_acme")
+        >>> Route(mongo, collection_name="events_2")
+
+    Args:
+        connection (MongoAPI): The connection, or the database, of the route.
+        database (Optional[str], optional): The database of the connection client to use instead of the connection database. Defaults to None.
+        collection_name (Optional[str], optional): The collection to use instead of the collection of the model. Defaults to None.
+        name (Optional[str], optional): The name of the route in the logs. Defaults to the database and collection names.
+    """
+
+    def __init__(self,
+                 connection: Union["MongoAPI", Any],
+                 database: Optional[str] = None,
+                 collection_name: Optional[str] = None,
+                 name: Optional[str] = None) -> None:
+        self.connection = connection
+        self.database = database
+        self.collection_name = collection_name
+        self._name = name
+        self._lock = threading.Lock()
+        self._bindings: "WeakKeyDictionary[type, ModelBinding]" = WeakKeyDictionary()
+        # The database of the client of the connection database, kept while the connection database is the same
+        self._resolved: Optional[Tuple[Any, Any]] = None
+
+    @property
+    def db(self) -> Any:
+        """The database of the route, resolved from the current database of the connection.
+
+        Raises:
+            ValueError: If the connection is not connected.
+        """
+        connection = self.connection
+        # A database has collections, a connection has the database once connected
+        db = connection if hasattr(connection, 'get_collection') else getattr(connection, 'db', None)
+        if db is None:
+            raise ValueError(f"The connection of the route {self!r} is not connected.")
+        if self.database is None or db.name == self.database:
+            return db
+        resolved = self._resolved
+        if resolved is None or resolved[0] is not db:
+            # pymongo creates a new database object on every `get_database`, the bindings are matched by identity
+            resolved = self._resolved = (db, db.client.get_database(self.database))
+        return resolved[1]
+
+    @property
+    def name(self) -> str:
+        if self._name:
+            return self._name
+        database = self.database
+        if database is None:
+            db = self.connection if hasattr(self.connection, 'get_collection') else getattr(self.connection, 'db', None)
+            database = getattr(db, 'name', '?')
+        return f"{database}.{self.collection_name or '*'}"
+
+    def binding(self, model: Type["Model"]) -> ModelBinding:
+        """The binding of the model on the route, created once per model, database and routing options."""
+        db = self.db
+        collection_name = self.collection_name or resolve_collection_name(model)
+        options = tuple(getattr(model, name, None) for name in ROUTING_OPTIONS)
+        binding = self._bindings.get(model)
+        if binding is not None and binding.matches(db, collection_name, options):
+            return binding
+        with self._lock:
+            binding = self._bindings.get(model)
+            if binding is None or not binding.matches(db, collection_name, options):
+                binding = ModelBinding(model, db, collection_name, options)
+                binding.ensure_indexes()
+                self._bindings[model] = binding
+            return binding
+
+    def __repr__(self) -> str:
+        return f"Route({self.name!r})"
+
+
+def as_route(route: Union[Route, "MongoAPI", Any]) -> Route:
+    return route if isinstance(route, Route) else Route(route)
+
+
+class Router:
+    """
+    Base class of the routers selecting the route of the documents of a model by the value of its `field`.
+    A model declares the router with the `router` attribute, the operations are routed by the equality
+    (or `$in`) on the field in their filter and the inserts by the field of the documents. The `find`,
+    `find_one` and `count_documents` without the field in the filter are run on all the routes concurrently.
+
+    Args:
+        field (str): The field holding the routing key.
+        max_workers (int, optional): The maximum number of the routes queried concurrently. Defaults to 8.
+    """
+
+    def __init__(self, field: str, max_workers: int = 8) -> None:
+        self.field = field
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def route(self, key: Any) -> Route:
+        raise NotImplementedError("Subclasses must implement the route method.")
+
+    def routes(self) -> List[Route]:
+        raise NotImplementedError("Subclasses must implement the routes method.")
+
+    def keys_of(self, mapping: Optional[Mapping[str, Any]]) -> Optional[List[Any]]:
+        """The routing keys tested by the filter or held by the document, None if the field is not tested."""
+        if not mapping or self.field not in mapping:
+            return None
+        value = mapping[self.field]
+        if isinstance(value, Mapping) and value and all(str(key).startswith("$") for key in value):
+            if set(value) == {"$eq"}:
+                return [value["$eq"]]
+            if set(value) == {"$in"}:
+                return list(value["$in"])
+            return None
+        return [value]
+
+    def routes_for(self, mapping: Optional[Mapping[str, Any]], scatter: bool = False) -> List[Route]:
+        """
+        The routes of the keys of the filter or document. All the routes are returned if the field is not tested
+        and `scatter` is set.
+
+        Raises:
+            ValueError: If the field is not tested and not `scatter`.
+        """
+        keys = self.keys_of(mapping)
+        if keys is None:
+            if scatter:
+                return self.routes()
+            raise ValueError(f"The {self.field} is required to route the operation.")
+        routes: List[Route] = []
+        for key in keys:
+            route = self.route(key)
+            if route not in routes:
+                routes.append(route)
+        return routes
+
+    def partition(self, documents: Sequence[Mapping[str, Any]]) -> List[Tuple[Route, List[int]]]:
+        """The indexes of the documents grouped by route, in the order of the first document of each route."""
+        groups: Dict[Route, List[int]] = {}
+        for index, document in enumerate(documents):
+            keys = self.keys_of(document)
+            if keys is None or len(keys) != 1:
+                raise ValueError(f"The document at {index} has no {self.field} to route it.")
+            groups.setdefault(self.route(keys[0]), []).append(index)
+        return list(groups.items())
+
+    def scatter(self, function: Callable[[T], R], items: Sequence[T]) -> List[R]:
+        """Calls the function with every item, e.g. the routes, concurrently. The results are in the order of the items.
+        The first error is raised once all the calls finished."""
+        if len(items) == 1:
+            return [function(items[0])]
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="mongodesu-router")
+            executor = self._executor
+        futures = [executor.submit(function, item) for item in items]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+class TenantRouter(Router):
+    """
+    Routes the documents by tenant, every tenant has its route, e.g. its database.
+
+        >>> router = TenantRouter({"acme": Route(eu_cluster, database="acme"), "globex": Route(us_cluster)})
+        >>> router = TenantRouter(factory=lambda tenant: Route(mongo, database=f"tenant_{tenant}"),
+        ...                       tenants=lambda: [tenant.slug for tenant in Tenant.find({})])
+
+    The operations without the tenant in their filter are scattered over the routes of the `tenants`, or without it
+    over the routes known in this process, the tenants created by the `factory` elsewhere are then left out.
+
+    Args:
+        routes (Optional[Mapping[Any, Union[Route, MongoAPI]]], optional): The route of every tenant. Defaults to None.
+        field (str, optional): The field holding the tenant id. Defaults to "tenant_id".
+        factory (Optional[Callable[[Any], Union[Route, MongoAPI]]], optional): Creates the route of the tenants
+            not in the routes, the created routes are cached. Defaults to None.
+        tenants (Optional[Callable[[], Iterable[Any]]], optional): Lists all the tenant ids, called on every scatter
+            of an operation over the tenants. Defaults to None, the tenants of the routes and the created routes.
+        max_workers (int, optional): The maximum number of the routes queried concurrently. Defaults to 8.
+    """
+
+    def __init__(self,
+                 routes: Optional[Mapping[Any, Union[Route, "MongoAPI"]]] = None,
+                 field: str = "tenant_id",
+                 factory: Optional[Callable[[Any], Union[Route, "MongoAPI"]]] = None,
+                 tenants: Optional[Callable[[], Iterable[Any]]] = None,
+                 max_workers: int = 8) -> None:
+        super().__init__(field, max_workers)
+        self._routes: Dict[Any, Route] = {key: as_route(route) for key, route in (routes or {}).items()}
+        self.factory = factory
+        self.tenants = tenants
+        self._lock = threading.Lock()
+
+    def route(self, key: Any) -> Route:
+        route = self._routes.get(key)
+        if route is not None:
+            return route
+        if self.factory is None:
+            raise ValueError(f"No route for the {self.field} {key!r}.")
+        with self._lock:
+            route = self._routes.get(key)
+            if route is None:
+                route = self._routes[key] = as_route(self.factory(key))
+            return route
+
+    def routes(self) -> List[Route]:
+        """The routes of the `tenants`, or of the known tenants without it. The routes shared by tenants are listed once."""
+        if self.tenants is not None:
+            candidates = [self.route(key) for key in self.tenants()]
+        else:
+            with self._lock:
+                candidates = list(self._routes.values())
+        routes: List[Route] = []
+        for route in candidates:
+            if route not in routes:
+                routes.append(route)
+        return routes
+
+
+class HashRouter(Router):
+    """
+    Spreads the documents over a fixed list of routes by a stable hash of the field, e.g. to shard
+    a collection over clusters. The key to route mapping changes if the routes are changed.
+
+        >>> router = HashRouter([Route(cluster_a), Route(cluster_b)], field="user_id")
+
+    Args:
+        routes (Sequence[Union[Route, MongoAPI]]): The routes.
+        field (str): The field to hash.
+        max_workers (int, optional): The maximum number of the routes queried concurrently. Defaults to 8.
+    """
+
+    def __init__(self, routes: Sequence[Union[Route, "MongoAPI"]], field: str, max_workers: int = 8) -> None:
+        if not routes:
+            raise ValueError("routes should not be empty.")
+        super().__init__(field, max_workers)
+        self._routes = [as_route(route) for route in routes]
+
+    def route(self, key: Any) -> Route:
+        # crc32 of the string, the builtin hash of the strings changes between the processes
+        return self._routes[zlib.crc32(str(key).encode("utf-8")) % len(self._routes)]
+
+    def routes(self) -> List[Route]:
+        return list(self._routes)
@@ -0,0 +1,162 @@
+import base64
+import io
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from inspect import isfunction
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+from weakref import WeakKeyDictionary
+
+from mongodesu.fields.base import Field, declared_fields
+
+_orjson: Any = None
+_orjson_checked = False
+
+
+def fast_json_backend() -> Any:
+    """Returns the `orjson` module if it is installed, it is used to encode the json when available."""
+    global _orjson, _orjson_checked
+    if not _orjson_checked:
+        try:
+            import orjson
+            _orjson = orjson
+        except ImportError:
+            _orjson = None
+        _orjson_checked = True
+    return _orjson
+
+
+def json_default(value: Any) -> Any:
+    """
+    Converts the values the json module can not encode: `ObjectId` and the other bson types to string,
+    dates to the iso format, sets and tuples to list, bytes to base64.
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if hasattr(value, "to_decimal"): # bson Decimal128
+        return str(value.to_decimal())
+    if type(value).__module__.startswith("bson"): # ObjectId, Regex, Timestamp...
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(data: Any, fast: bool = True) -> bytes:
+    """Encode the data to json as utf-8 bytes, see `dumps`."""
+    orjson = fast_json_backend() if fast else None
+    if orjson is not None:
+        return orjson.dumps(data, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return dumps(data, fast).encode("utf-8")
+
+
+def dumps(data: Any, fast: bool = True) -> str:
+    """Encode the data to a json string. If `fast`, the json is compact and encoded with `orjson` if it is installed,
+    otherwise it is encoded with the default separators of the json module."""
+    if not fast:
+        return json.dumps(data, default=json_default)
+    orjson = fast_json_backend()
+    if orjson is not None:
+        return orjson.dumps(data, default=json_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, default=json_default, separators=(",", ":"), ensure_ascii=False)
+
+
+class ModelEncoder:
+    """
+    Encoder compiled once per model class from its declared fields, so the documents are converted
+    without walking the class attributes on every call. Use `get_encoder` to get the cached encoder of a class.
+    """
+
+    def __init__(self, model: type) -> None:
+        self.model = model
+        self.fields: Tuple[str, ...] = tuple(declared_fields(model))
+        self._defaults: List[Tuple[str, Callable[[], Any]]] = [
+            (key, self._default_factory(field)) for key, field in declared_fields(model).items()
+        ]
+
+    @staticmethod
+    def _default_factory(field: Field) -> Callable[[], Any]:
+        default = getattr(field, 'default', None)
+        if isfunction(default):
+            return default
+        return lambda: default
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        """The projection to only read the declared fields and the `_id` from the collection."""
+        return {key: 1 for key in self.fields}
+
+    def encode_instance(self, instance: Any) -> Dict[str, Any]:
+        """The dictionary of the declared fields of the instance, with the `_id` if it is set."""
+        data = {key: getattr(instance, key) for key in self.fields}
+        if '_id' in instance.__dict__:
+            data['_id'] = instance.__dict__['_id']
+        return data
+
+    def encode_document(self, document: Mapping[str, Any]) -> Dict[str, Any]:
+        """The same dictionary as `encode_instance` built from a raw document, without hydrating the model.
+        The missing and null fields get their default, like the fields set to None on an instance."""
+        data = {}
+        for key, default in self._defaults:
+            value = document.get(key)
+            data[key] = default() if value is None else value
+        if '_id' in document:
+            data['_id'] = document['_id']
+        return data
+
+    def iter_ndjson(self, documents: Iterable[Mapping[str, Any]], fast: bool = True) -> Iterable[bytes]:
+        for document in documents:
+            yield dumps_bytes(self.encode_document(document), fast) + b"\n"
+
+
+_encoders: "WeakKeyDictionary[type, ModelEncoder]" = WeakKeyDictionary()
+
+
+def get_encoder(model: type) -> ModelEncoder:
+    encoder = _encoders.get(model)
+    if encoder is None:
+        encoder = _encoders[model] = ModelEncoder(model)
+    return encoder
+
+
+def to_bson(data: Mapping[str, Any]) -> bytes:
+    from bson import encode
+
+    return encode(data)
+
+
+def write_lines(stream: Any, chunk: List[bytes]) -> None:
+    """Write the encoded lines to a binary or text stream, or to a socket."""
+    payload = b"".join(chunk)
+    if hasattr(stream, "sendall"):
+        stream.sendall(payload)
+    elif isinstance(stream, io.TextIOBase):
+        stream.write(payload.decode("utf-8"))
+    else:
+        stream.write(payload)
+
+
+def iter_chunks(lines: Iterable[bytes], size: int) -> Iterable[List[bytes]]:
+    chunk: List[bytes] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_ndjson(encoder: ModelEncoder, documents: Iterable[Mapping[str, Any]], stream: Any,
+                  batch_size: int = 1000, fast: bool = True) -> int:
+    """Write the documents to the stream as newline delimited json, `batch_size` lines per write."""
+    count = 0
+    for chunk in iter_chunks(encoder.iter_ndjson(documents, fast), batch_size):
+        write_lines(stream, chunk)
+        count += len(chunk)
+    return count
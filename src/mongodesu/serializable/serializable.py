@@ -1,5 +1,7 @@
 import json
 from typing import Any, Dict, Type, TypeVar
+
+from mongodesu.serializable.encoder import dumps, to_bson
 T = TypeVar("T", bound="Serializable")
 
 class Serializable:
@@ -20,9 +22,16 @@ class Serializable:
         obj.__dict__.update(data)
         return obj
 
-    def to_json(self) -> str:
-        """Serialize object to JSON string."""
-        return json.dumps(self.to_dict())
+    def to_json(self, fast: bool = False) -> str:
+        """
+        Serialize object to JSON string. `ObjectId` and the other bson values are converted to string and the dates
+        to the iso format. With `fast` the json is compact and encoded with `orjson` when it is installed.
+        """
+        return dumps(self.to_dict(), fast)
+
+    def to_bson(self) -> bytes:
+        """Serialize object to BSON bytes."""
+        return to_bson(self.to_dict())
 
     @classmethod
     def from_json(cls: Type[T], data: str) -> T:
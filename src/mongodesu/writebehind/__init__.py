@@ -0,0 +1,6 @@
+from .buffer import WriteBehindBuffer, POLICIES
+
+__all__ = [
+    "WriteBehindBuffer",
+    "POLICIES"
+]
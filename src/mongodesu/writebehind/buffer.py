@@ -0,0 +1,298 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type, Union, TYPE_CHECKING
+
+from mongodesu.counts.cache import invalidating
+from mongodesu.instrumentation.hooks import track
+from mongodesu.instrumentation.metrics import Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from pymongo.results import InsertOneResult
+    from mongodesu.mongolib import Model, MongoAPI
+
+POLICIES = ("block", "drop", "spill")
+
+logger = logging.getLogger("mongodesu.writebehind")
+
+# The model, the collection, the document and the time it was enqueued
+_Entry = Tuple[Type["Model"], Any, Dict[str, Any], float]
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process buffer of the inserts of the models declaring it as their `write_behind`. `insert_one` and
+    `save` return once the validated document is enqueued, a background thread writes the documents with
+    `insert_many` once `batch_size` documents are pending or the oldest one waited `flush_interval` seconds.
+
+        >>> class AuditLog(Model):
+        ...     write_behind = WriteBehindBuffer(max_size=10000, batch_size=500, flush_interval=1.0, policy="drop")
+
+    The `_id` of the documents is generated on enqueue, the returned `InsertOneResult` is not acknowledged.
+    The pending documents are flushed on `close`, which is called at the interpreter exit.
+
+    Args:
+        max_size (int, optional): The maximum number of the pending documents. Defaults to 10000.
+        batch_size (int, optional): The maximum number of the documents per `insert_many`. Defaults to 500.
+        flush_interval (float, optional): The maximum seconds a document waits before it is written. Defaults to 1.0.
+        policy (str, optional): What to do with a document when the buffer is full: `block` the caller until there
+            is space, `drop` the document, or `spill` it to the `spill_path` file. Defaults to "block".
+        spill_path (Optional[str], optional): The file the documents are appended to as bson with the `spill` policy,
+            and when a batch can not be written. Load it back with `replay_spill`. Defaults to None.
+        name (str, optional): The `buffer` label of the metrics. Defaults to "default".
+        namespace (str, optional): The prefix of the metric names. Defaults to "mongodesu".
+    """
+
+    def __init__(self,
+                 max_size: int = 10000,
+                 batch_size: int = 500,
+                 flush_interval: float = 1.0,
+                 policy: str = "block",
+                 spill_path: Optional[str] = None,
+                 name: str = "default",
+                 namespace: str = "mongodesu") -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"policy should be one of {POLICIES}.")
+        if policy == "spill" and not spill_path:
+            raise ValueError("spill_path is required with the spill policy.")
+        if max_size < 1 or batch_size < 1:
+            raise ValueError("max_size and batch_size should be positive.")
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.spill_path = spill_path
+        self.labels = (("buffer", name),)
+
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._pending_changed = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._spill_lock = threading.Lock()
+        self._pending: "deque[_Entry]" = deque()
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.depth = Gauge(f"{namespace}_write_behind_depth", "Number of the documents waiting to be written.")
+        self.enqueued = Counter(f"{namespace}_write_behind_enqueued_total", "Number of the enqueued documents.")
+        self.written = Counter(f"{namespace}_write_behind_written_total", "Number of the written documents.")
+        self.dropped = Counter(f"{namespace}_write_behind_dropped_total",
+                               "Number of the documents dropped as the buffer was full.")
+        self.spilled = Counter(f"{namespace}_write_behind_spilled_total", "Number of the documents spilled to file.")
+        self.failed = Counter(f"{namespace}_write_behind_failed_total", "Number of the documents which failed to write.")
+        self.flush_duration = Histogram(f"{namespace}_write_behind_flush_seconds", "Duration of the insert_many flushes.")
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mongodesu-write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def enqueue(self, model: Type["Model"], collection: Any, document: Dict[str, Any]) -> "InsertOneResult":
+        """Adds the validated document to the buffer, the `_id` is set on the document if missing."""
+        from bson import ObjectId
+        from pymongo.results import InsertOneResult
+
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        result = InsertOneResult(document["_id"], acknowledged=False)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The write-behind buffer is closed.")
+            self._start()
+            while len(self._pending) >= self.max_size:
+                if self.policy == "drop":
+                    self.dropped.inc(self.labels)
+                    return result
+                if self.policy == "spill":
+                    break
+                self._not_full.wait()
+                if self._closed:
+                    raise RuntimeError("The write-behind buffer is closed.")
+            else:
+                self._pending.append((model, collection, document, time.monotonic()))
+                self.enqueued.inc(self.labels)
+                self.depth.set(self.labels, len(self._pending) + self._in_flight)
+                if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                    self._pending_changed.notify()
+                return result
+        self._spill(collection, [document])
+        return result
+
+    def _next_batch(self) -> Optional[List[_Entry]]:
+        """Waits until a batch is due, returns None once the buffer is closed and empty."""
+        with self._lock:
+            while True:
+                if not self._pending:
+                    if self._closed:
+                        return None
+                    self._pending_changed.wait()
+                    continue
+                if len(self._pending) >= self.batch_size or self._closed or self._flush_waiters:
+                    break
+                remaining = self._pending[0][3] + self.flush_interval - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._pending_changed.wait(remaining)
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._in_flight += len(batch)
+            self._not_full.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            except Exception:
+                # The thread is kept alive, the blocked callers and `close` wait for it
+                logger.exception("Could not write %d documents", len(batch))
+                self.failed.inc(self.labels, len(batch))
+            finally:
+                with self._lock:
+                    self._in_flight -= len(batch)
+                    self.depth.set(self.labels, len(self._pending) + self._in_flight)
+                    self._idle.notify_all()
+
+    def _write(self, batch: List[_Entry]) -> None:
+        from pymongo.errors import BulkWriteError
+
+        # The documents are grouped by collection, the order is kept within a collection
+        groups: Dict[int, Tuple[Type["Model"], Any, List[Dict[str, Any]]]] = {}
+        for model, collection, document, _ in batch:
+            groups.setdefault(id(collection), (model, collection, []))[2].append(document)
+        for model, collection, documents in groups.values():
+            started = time.perf_counter()
+            try:
+                with track(model, "write_behind_flush", None, collection) as event, invalidating(model, collection):
+                    result = collection.insert_many(documents, ordered=False)
+                    event.set_result(len(result.inserted_ids), documents)
+                self.written.inc(self.labels, len(documents))
+            except BulkWriteError as error:
+                errors = error.details.get("writeErrors", [])
+                self.written.inc(self.labels, len(documents) - len(errors))
+                self.failed.inc(self.labels, len(errors))
+                logger.error("%d of %d documents of %s failed to write: %s", len(errors), len(documents),
+                             collection.name, errors[0].get("errmsg") if errors else error)
+            except Exception:
+                logger.exception("Could not write %d documents to %s", len(documents), collection.name)
+                if self.spill_path:
+                    self._spill(collection, documents)
+                else:
+                    self.failed.inc(self.labels, len(documents))
+            finally:
+                self.flush_duration.observe(self.labels, time.perf_counter() - started)
+
+    def _spill(self, collection: Any, documents: List[Mapping[str, Any]]) -> None:
+        from bson import encode
+
+        assert self.spill_path is not None
+        with self._spill_lock, open(self.spill_path, "ab") as file:
+            for document in documents:
+                file.write(encode({"database": collection.database.name, "collection": collection.name,
+                                   "document": document}))
+        self.spilled.inc(self.labels, len(documents))
+
+    def replay_spill(self, connection: Union["MongoAPI", Any]) -> int:
+        """
+        Inserts the spilled documents into their collections, e.g. on the start of the service, and truncates
+        the spill file. The documents already inserted by an interrupted replay are skipped.
+
+        Args:
+            connection (MongoAPI): The connection, or a database, of the client to insert with. The documents are inserted
+                into the database they were spilled from, e.g. the database of their tenant.
+
+        Returns:
+            int: The number of the inserted documents
+        """
+        from bson import decode_file_iter
+        from pymongo.errors import BulkWriteError
+
+        if not self.spill_path:
+            return 0
+        db = getattr(connection, 'db', connection)
+        inserted = 0
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return 0
+            groups: Dict[Tuple[Optional[str], str], List[Mapping[str, Any]]] = {}
+            with open(self.spill_path, "rb") as file:
+                for record in decode_file_iter(file):
+                    groups.setdefault((record.get("database"), record["collection"]), []).append(record["document"])
+            for (database, name), documents in groups.items():
+                # The records spilled without their database go to the database of the connection
+                target = db if database is None or database == db.name else db.client.get_database(database)
+                try:
+                    inserted += len(target.get_collection(name).insert_many(documents, ordered=False).inserted_ids)
+                except BulkWriteError as error:
+                    inserted += error.details.get("nInserted", 0)
+            open(self.spill_path, "wb").close()
+        return inserted
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Writes the pending documents now and waits until they are written.
+
+        Returns:
+            bool: False if the timeout expired before the documents were written
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._flush_waiters += 1
+            try:
+                self._pending_changed.notify()
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._idle.wait(remaining)
+                return True
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """Writes the pending documents and stops the background thread. The buffer can not be used afterwards.
+
+        Args:
+            timeout (Optional[float], optional): The maximum seconds to wait for the pending documents, None to wait
+                until they are written. Defaults to 30.
+
+        Returns:
+            bool: False if the timeout expired before the documents were written
+        """
+        with self._lock:
+            self._closed = True
+            self._pending_changed.notify_all()
+            self._not_full.notify_all()
+            thread = self._thread
+        atexit.unregister(self.close)
+        if thread is None or thread is threading.current_thread():
+            return True
+        written = self.flush(timeout)
+        if not written:
+            logger.error("%d documents were not written before the buffer was closed", self.pending)
+        thread.join(0 if not written else timeout)
+        return written
+
+    @property
+    def pending(self) -> int:
+        """The number of the documents not written yet."""
+        with self._lock:
+            return len(self._pending) + self._in_flight
+
+    def render(self) -> str:
+        """The metrics of the buffer in the prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in (self.depth, self.enqueued, self.written, self.dropped, self.spilled, self.failed,
+                       self.flush_duration):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        return f"WriteBehindBuffer(max_size={self.max_size}, batch_size={self.batch_size}, policy={self.policy!r})"
@@ -0,0 +1,10 @@
+import pytest
+
+from mongodesu import MongoAPI
+from mongodesu.backends import MemoryBackend
+
+
+@pytest.fixture
+def mongo():
+    """A connection to an empty in-memory database, shared by the models of a test."""
+    return MongoAPI(backend=MemoryBackend(), database="test_mongodesu")
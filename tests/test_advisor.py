@@ -0,0 +1,73 @@
+import pytest
+
+from mongodesu import Model
+from mongodesu.advisor import QueryAdvisor, classify_plan
+from mongodesu.fields import StringField, NumberField
+from mongodesu.instrumentation import register, unregister
+
+
+@pytest.fixture
+def User(mongo):
+
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        name = StringField(required=True)
+        email = StringField(required=True, unique=True)
+        age = NumberField(required=False)
+
+    User.insert_many([{"name": f"user{i}", "email": f"user{i}@example.com", "age": i % 50} for i in range(100)])
+    return User
+
+
+@pytest.fixture
+def advisor():
+    advisor = register(QueryAdvisor(sample_rate=1.0))
+    yield advisor
+    unregister(advisor)
+
+
+def test_classify_plan():
+    assert classify_plan({"stage": "COLLSCAN"}) == "COLLSCAN"
+    assert classify_plan({"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "email_1"}}) == "IXSCAN"
+    assert classify_plan({"stage": "IDHACK"}) == "IXSCAN"
+    assert classify_plan({"queryPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}) == "COLLSCAN"
+
+
+def test_collection_scans_are_aggregated_per_filter_shape(User, advisor):
+    User.find({"name": "user1"})
+    User.find({"name": "user2"})
+    User.count_documents({"name": "user3"})
+    User.find_one({"email": "user4@example.com"})
+
+    findings = {str(finding.filter_shape): finding for finding in advisor.findings()}
+    by_name = findings[str({"name": "?"})]
+    assert by_name.samples == 3
+    assert by_name.collscans == 3
+    assert by_name.operations == {"find", "count_documents"}
+    assert by_name.examined_ratio == 100
+
+    by_email = findings[str({"email": "?"})]
+    assert by_email.collscans == 0
+    assert by_email.indexes_used == {"email_1"}
+    assert advisor.problems() == [by_name]
+
+
+def test_suggestions_refer_to_declared_fields(User, advisor):
+    User.find({"name": "user1"})
+    User.delete_many({"age": 3, "name": "user3"})
+    User.find({"email": "user1@example.com"})
+
+    messages = [str(suggestion) for suggestion in advisor.suggestions()]
+    assert messages[0].startswith("mark `User.name` index=True")
+    assert messages[1].startswith("create a compound index on User (`age`, `name`)")
+    assert len(messages) == 2
+
+
+def test_sampling(User):
+    advisor = register(QueryAdvisor(sample_rate=0.0))
+    try:
+        User.find({"name": "user1"})
+    finally:
+        unregister(advisor)
+    assert advisor.findings() == []
@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mongodesu import Model
+from mongodesu.backends.memory import MemoryCollection
+from mongodesu.binding import get_binding
+from mongodesu.fields import StringField, NumberField
+
+THREADS = 8
+OPERATIONS = 200
+
+
+@pytest.fixture
+def User(mongo):
+
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        email = StringField(required=True, unique=True)
+        worker = NumberField(required=True, index=True)
+        visits = NumberField(required=False, default=0)
+
+    return User
+
+
+def document_operations(User, worker, i):
+    """Runs the model operations on one document, they are looked up by `_id` or the unique email."""
+    email = f"user{worker}-{i}@example.com"
+    if i % 2:
+        User.insert_one({"email": email, "worker": worker, "visits": 0})
+    else:
+        User(email=email, worker=worker, visits=0).save()
+    User.update_one({"email": email}, {"$inc": {"visits": 1}})
+    user = User.find_one({"email": email})
+    assert user.visits == 1 and user.worker == worker
+    user.visits = 2
+    user.save()
+    if i % 4 == 0:
+        assert User.delete_one({"email": email}).deleted_count == 1
+
+
+def hammer(User, worker, operations):
+    """Runs all the model operations on the documents of the worker, returns the number of the documents left."""
+    for i in range(operations):
+        document_operations(User, worker, i)
+    User.update_many({"worker": worker}, {"$inc": {"visits": 1}})
+    assert all(user.visits == 3 for user in User.find({"worker": worker}))
+    assert list(User.aggregate([{"$match": {"worker": worker}}, {"$count": "n"}]))[0]["n"] == User.count_documents(
+        {"worker": worker})
+    return User.count_documents({"worker": worker})
+
+
+def test_binding_is_shared_and_indexes_are_created_once(User, monkeypatch):
+    binding = get_binding(User)
+    calls = []
+    create_index = MemoryCollection.create_index
+    monkeypatch.setattr(MemoryCollection, "create_index",
+                        lambda self, *args, **kwargs: calls.append(kwargs) or create_index(self, *args, **kwargs))
+    for _ in range(10):
+        User.find_one({"email": "john@example.com"})
+        User(email="x@example.com", worker=0)
+    assert get_binding(User) is binding and User().collection is binding.collection
+    assert calls == []
+    with pytest.raises(AttributeError):
+        binding.collection_name = "people"
+
+    User.collection_name = "people" # Changed options bind the model again
+    assert get_binding(User).collection_name == "people" and len(calls) == 2
+
+
+def test_binding_follows_dropped_collection(User):
+    db = User.connection.db
+    User.insert_many([{"email": "a@example.com", "worker": 0}, {"email": "b@example.com", "worker": 0}])
+    binding = get_binding(User)
+    db.get_collection("users").drop()
+    assert "users" not in db.list_collection_names()
+    assert User.count_documents({}) == db.get_collection("users").count_documents({}) == 0
+
+    User.insert_one({"email": "c@example.com", "worker": 0})
+    assert db.get_collection("users").count_documents({}) == 1 and "users" in db.list_collection_names()
+    db.client.backend.reset()
+    assert User.count_documents({}) == 0 and User.find_one({"email": "c@example.com"}) is None
+    assert get_binding(User) is binding
+
+
+def test_concurrent_operations(User):
+    barrier = threading.Barrier(THREADS)
+
+    def run(worker):
+        barrier.wait()
+        return hammer(User, worker, OPERATIONS)
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        left = list(pool.map(run, range(THREADS)))
+
+    assert left == [OPERATIONS - OPERATIONS // 4] * THREADS
+    assert User.count_documents({}) == THREADS * (OPERATIONS - OPERATIONS // 4)
+    assert User.count_documents({"visits": 3}) == User.count_documents({})
+
+
+def test_threads_share_one_binding_and_create_the_indexes_once(User, monkeypatch):
+    calls = []
+    create_index = MemoryCollection.create_index
+    monkeypatch.setattr(MemoryCollection, "create_index",
+                        lambda self, *args, **kwargs: calls.append(kwargs) or create_index(self, *args, **kwargs))
+    barrier = threading.Barrier(THREADS)
+
+    def run(worker):
+        barrier.wait() # All the threads bind the model at once
+        for i in range(OPERATIONS // 4):
+            document_operations(User, worker, i)
+        return get_binding(User)
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        bindings = list(pool.map(run, range(THREADS)))
+
+    assert all(binding is bindings[0] for binding in bindings)
+    assert len(calls) == 2 # The unique email and the worker index
+    left = sum(1 for i in range(OPERATIONS // 4) if i % 4) # Every fourth document is deleted
+    assert User.count_documents({}) == THREADS * left
+    assert sorted(index["key"][0][0] for index in User.connection.db.get_collection("users").list_indexes()) == [
+        "_id", "email", "worker"]
@@ -0,0 +1,114 @@
+import time
+
+from mongodesu import Model
+from mongodesu.counts import CountCache
+from mongodesu.fields import StringField, NumberField
+from mongodesu.routing import Route, TenantRouter
+
+
+def order_model(mongo, cache):
+    class Order(Model):
+        connection = mongo
+        collection_name = 'orders'
+        count_cache = cache
+        status = StringField(required=True)
+        total = NumberField(required=False)
+
+    return Order
+
+
+def test_estimated_count(mongo):
+    Order = order_model(mongo, None)
+    Order.insert_many([{"status": "paid", "total": i} for i in range(7)])
+    assert Order.estimated_count() == 7
+
+    router = TenantRouter({"a": Route(mongo, database="tenant_a"), "b": Route(mongo, database="tenant_b")})
+
+    class Invoice(Model):
+        collection_name = 'invoices'
+        tenant_id = StringField(required=True)
+
+    Invoice.router = router
+    Invoice.insert_many([{"tenant_id": "a"}, {"tenant_id": "b"}, {"tenant_id": "b"}])
+    assert Invoice.estimated_count() == 3
+    router.close()
+
+
+def test_counts_cached_per_filter_and_invalidated_on_writes(mongo):
+    cache = CountCache(ttl=60)
+    Order = order_model(mongo, cache)
+    Order.insert_many([{"status": "paid"}, {"status": "paid"}, {"status": "open"}])
+
+    assert Order.count_documents({"status": "paid"}) == 2
+    assert Order.count_documents({"status": "open"}) == 1
+    assert Order.count_documents({"status": "paid"}, limit=1) == 1
+    # Written by another process, not seen until the counts expire
+    mongo.db.get_collection("orders").insert_one({"status": "paid"})
+    assert Order.count_documents({"status": "paid"}) == 2
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+
+    Order.insert_one({"status": "paid"})
+    assert len(cache) == 0
+    assert Order.count_documents({"status": "paid"}) == 4
+    Order.delete_many({"status": "open"})
+    assert Order.count_documents({"status": "open"}) == 0
+    order = Order(status="open")
+    order.save()
+    assert Order.count_documents({"status": "open"}) == 1
+
+
+def test_counts_expire(mongo):
+    cache = CountCache(ttl=0.05)
+    Order = order_model(mongo, cache)
+    assert Order.count_documents({}) == 0
+    mongo.db.get_collection("orders").insert_one({"status": "paid"})
+    assert Order.count_documents({}) == 0
+    time.sleep(0.1)
+    assert Order.count_documents({}) == 1
+
+
+def test_stale_count_refreshed_in_background(mongo):
+    cache = CountCache(ttl=0.05, stale_ttl=60)
+    Order = order_model(mongo, cache)
+    Order.insert_one({"status": "paid"})
+    assert Order.count_documents({}) == 1
+
+    Order.insert_one({"status": "paid"})
+    # Invalidated, the stale count is returned while it is refreshed
+    assert Order.count_documents({}) == 1
+    assert cache.stale_hits == 1
+    deadline = time.monotonic() + 5
+    while Order.count_documents({}) != 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Order.count_documents({}) == 2
+    assert cache.hits >= 1
+
+
+def test_count_started_before_a_write_is_not_cached(mongo):
+    cache = CountCache(ttl=60)
+    Order = order_model(mongo, cache)
+
+    def count():
+        # A write of the model while counting
+        Order.insert_one({"status": "paid"})
+        return 0
+
+    assert cache.get(mongo.db, "orders", "all", count) == 0
+    assert len(cache) == 0
+    assert Order.count_documents({}) == 1
+
+
+def test_least_recently_used_counts_are_evicted(mongo):
+    cache = CountCache(ttl=60, max_entries=3)
+    Order = order_model(mongo, cache)
+    for status in ("paid", "open", "void"):
+        Order.count_documents({"status": status})
+    Order.count_documents({"status": "paid"}) # Used again, "open" is now the least recently used
+    Order.count_documents({"status": "lost"})
+    assert len(cache) == 3
+    misses = cache.misses
+    Order.count_documents({"status": "paid"})
+    Order.count_documents({"status": "void"})
+    assert cache.misses == misses
+    Order.count_documents({"status": "open"})
+    assert cache.misses == misses + 1
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+
+# Modules which are slow to import and must only be loaded when they are actually needed
+DEFERRED_MODULES = ["inflect", "dateutil", "pymongo", "mongodesu.backends.memory"]
+
+
+def run_python(code):
+    output = subprocess.run([sys.executable, "-W", "error::DeprecationWarning", "-c", code],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_import_does_not_load_the_deferred_modules():
+    loaded = run_python(
+        "import sys, json\n"
+        "import mongodesu, mongodesu.fields, mongodesu.instrumentation, mongodesu.backends\n"
+        f"print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))"
+    )
+    assert loaded == []
+
+
+def test_model_with_collection_name_does_not_load_inflect():
+    loaded = run_python(
+        "import sys, json\n"
+        "from mongodesu import Model, MongoAPI\n"
+        "from mongodesu.fields import StringField, DateField\n"
+        "MongoAPI.connect(uri='memory:///test')\n"
+        "class User(Model):\n"
+        "    collection_name = 'users'\n"
+        "    name = StringField(required=True)\n"
+        "    created_at = DateField(required=False)\n"
+        "User.insert_one({'name': 'John'})\n"
+        "print(json.dumps([name for name in ['inflect', 'dateutil'] if name in sys.modules]))"
+    )
+    assert loaded == []
+
+
+def test_import_time_budget():
+    """Cumulative import time of mongodesu, as reported by `python -X importtime`, in microseconds."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import mongodesu"],
+                            check=True, capture_output=True, text=True).stderr
+    cumulative = {line.split("|")[2].strip(): int(line.split("|")[1]) for line in stderr.splitlines()
+                  if line.startswith("import time:") and line.split("|")[1].strip().isdigit()}
+    # Generous budget, the deferred modules alone take well over a second to import on a cold start
+    assert cumulative["mongodesu"] < 1_000_000
+
+
+def test_collection_name_is_constructed_once():
+    from mongodesu import mongolib
+
+    mongolib.COLLECTION_NAME_CACHE.pop("Category", None)
+    assert mongolib.pluralize("Category") == "categories"
+    mongolib.COLLECTION_NAME_CACHE["Category"] = "category_list"
+    assert mongolib.pluralize("Category") == "category_list"
+    mongolib.COLLECTION_NAME_CACHE.pop("Category")
@@ -0,0 +1,123 @@
+import logging
+
+import pytest
+
+from mongodesu import Model
+from mongodesu.fields import StringField, NumberField
+from mongodesu.instrumentation import (Instrument, MetricsInstrument, SlowQueryLogger, redact_filter, register,
+                                       unregister)
+
+
+class Recorder(Instrument):
+    measure_bytes = True
+
+    def __init__(self):
+        self.before_events = []
+        self.events = []
+
+    def before(self, event):
+        self.before_events.append(event.operation)
+
+    def after(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def User(mongo):
+
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        name = StringField(required=True)
+        email = StringField(required=True, unique=True)
+        age = NumberField(required=False)
+
+    User.insert_many([
+        {"name": "John", "email": "john@example.com", "age": 28},
+        {"name": "Jack", "email": "jack@example.com", "age": 35},
+    ])
+    return User
+
+
+@pytest.fixture
+def recorder():
+    recorder = register(Recorder())
+    yield recorder
+    unregister(recorder)
+
+
+def test_redact_filter_keeps_the_shape():
+    assert redact_filter({"age": {"$gt": 30}, "$or": [{"name": "John"}, {"tags": {"$in": ["a", "b"]}}]}) == \
+        {"age": {"$gt": "?"}, "$or": [{"name": "?"}, {"tags": {"$in": "?"}}]}
+    assert redact_filter(None) == {}
+
+
+def test_events_report_the_operations(User, recorder):
+    User.find({"age": {"$gt": 30}})
+    User.find_one({"email": "john@example.com"})
+    User.update_many({}, {"$inc": {"age": 1}})
+    User.delete_one({"name": "John"})
+    User.count_documents({})
+
+    assert recorder.before_events == ["find", "find_one", "update_many", "delete_one", "count_documents"]
+    find, find_one, update_many, delete_one, count = recorder.events
+    assert find.model_name == "User"
+    assert find.filter_shape == {"age": {"$gt": "?"}}
+    assert find.documents == 1 and find.bytes > 0
+    assert find.duration is not None and find.duration >= 0
+    assert find.uses_index is False
+    assert find_one.uses_index is True
+    assert update_many.documents == 2
+    assert delete_one.documents == 1
+    assert count.documents == 1
+
+
+def test_errors_are_reported(User, recorder):
+    with pytest.raises(Exception):
+        User.insert_one({"name": "Other", "email": "john@example.com"}, bypass_document_validation=True)
+    assert recorder.events[-1].operation == "insert_one"
+    assert recorder.events[-1].error is not None
+
+
+def test_model_level_instruments(User):
+    recorder = Recorder()
+    User.instruments = [recorder]
+    User.find({})
+    assert [event.operation for event in recorder.events] == ["find"]
+
+
+def test_slow_query_logger(User, caplog):
+    logger = register(SlowQueryLogger(threshold_ms=0))
+    try:
+        with caplog.at_level(logging.WARNING, logger="mongodesu.slow_query"):
+            User.find({"name": "secret value"})
+    finally:
+        unregister(logger)
+    assert "Slow query User.find" in caplog.text
+    assert "secret value" not in caplog.text
+
+
+def test_metrics_render(User):
+    metrics = register(MetricsInstrument())
+    try:
+        User.find({"name": "John"})
+        User.find({"name": "Jack"})
+    finally:
+        unregister(metrics)
+    labels = (("model", "User"), ("operation", "find"))
+    assert metrics.operations.value(labels) == 2
+    assert metrics.unindexed.value(labels) == 2
+    assert metrics.duration.count(labels) == 2
+    output = metrics.render()
+    assert 'mongodesu_operations_total{model="User",operation="find"} 2' in output
+    assert 'mongodesu_operation_duration_seconds_bucket{model="User",operation="find",le="+Inf"} 2' in output
+    assert "mongodesu_bytes_total" not in output
+
+
+def test_metrics_measure_bytes(User):
+    metrics = register(MetricsInstrument(measure_bytes=True))
+    try:
+        User.find({"name": "John"})
+    finally:
+        unregister(metrics)
+    assert metrics.bytes.value((("model", "User"), ("operation", "find"))) > 0
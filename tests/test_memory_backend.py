@@ -0,0 +1,112 @@
+import re
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from mongodesu import MongoAPI, Model
+from mongodesu.fields import StringField, NumberField, ListField
+
+
+def make_user_model(mongo):
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        name = StringField(required=True)
+        email = StringField(required=True, unique=True)
+        age = NumberField(required=False)
+        tags = ListField(required=False, item_type=str)
+
+    return User
+
+
+@pytest.fixture
+def User(mongo):
+    User = make_user_model(mongo)
+    User.insert_many([
+        {"name": "John", "email": "john@example.com", "age": 28, "tags": ["admin", "staff"]},
+        {"name": "Jack", "email": "jack@example.com", "age": 35, "tags": ["staff"]},
+        {"name": "Jane", "email": "jane@example.com", "age": 42, "tags": []},
+    ])
+    return User
+
+
+def test_find_with_query_operators(User):
+    assert [user.name for user in User.find({"age": {"$gte": 30}})] == ["Jack", "Jane"]
+    assert [user.name for user in User.find({"tags": "staff"})] == ["John", "Jack"]
+    assert [user.name for user in User.find({"name": {"$in": ["Jane", "Nobody"]}})] == ["Jane"]
+    assert [user.name for user in User.find({"$or": [{"age": 28}, {"name": {"$regex": "^ja", "$options": "i"}}]})] == ["John", "Jack", "Jane"]
+    assert [user.name for user in User.find({"name": re.compile("^Ja")}, sort=[("age", -1)], limit=1)] == ["Jane"]
+    assert User.count_documents({"tags": {"$size": 0}}) == 1
+
+
+def test_find_one_returns_model_instance(User):
+    user = User.find_one({"email": "jack@example.com"})
+    assert isinstance(user, User)
+    assert user.age == 35
+    assert User.find_one({"email": "nobody@example.com"}) is None
+
+
+def test_update_operators(User):
+    result = User.update_one({"name": "John"}, {"$set": {"age": 29}, "$push": {"tags": "owner"}})
+    assert result.matched_count == 1 and result.modified_count == 1
+    User.update_many({"age": {"$gt": 30}}, {"$inc": {"age": 1}})
+
+    assert User.find_one({"name": "John"}).tags == ["admin", "staff", "owner"]
+    assert [user.age for user in User.find({}, sort="age")] == [29, 36, 43]
+
+
+def test_upsert_and_delete(User):
+    result = User.update_one({"email": "new@example.com"}, {"$set": {"name": "New"}}, upsert=True)
+    assert result.upserted_id is not None
+    assert User.count_documents({}) == 4
+
+    assert User.delete_one({"name": "New"}).deleted_count == 1
+    assert User.delete_many({"age": {"$lt": 40}}).deleted_count == 2
+    assert [user.name for user in User.find()] == ["Jane"]
+
+
+def test_unique_index_is_enforced(User):
+    with pytest.raises(DuplicateKeyError):
+        User.insert_one({"name": "Other John", "email": "john@example.com", "tags": []})
+    with pytest.raises(DuplicateKeyError):
+        User.update_one({"name": "Jack"}, {"$set": {"email": "jane@example.com"}})
+
+    User.delete_one({"email": "john@example.com"})
+    User.insert_one({"name": "Other John", "email": "john@example.com", "tags": []})
+
+
+def test_save_inserts_then_updates(mongo):
+    User = make_user_model(mongo)
+    user = User(name="Alice", email="alice@example.com", age=20, tags=[])
+    user.save()
+    user.age = 21
+    user.save()
+
+    assert User.count_documents({}) == 1
+    assert User.find_one({"_id": user._id}).age == 21
+
+
+def test_aggregate(User):
+    result = list(User.aggregate([
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+    ]))
+    assert result == [{"_id": "staff", "count": 2}, {"_id": "admin", "count": 1}]
+
+
+def test_memory_uri_shares_data_between_connections():
+    mongo1 = MongoAPI(uri="memory:///shared_test")
+    mongo2 = MongoAPI(uri="memory:///shared_test")
+    mongo1.db.get_collection("items").insert_one({"x": 1})
+    assert mongo2.db.get_collection("items").count_documents({"x": 1}) == 1
+    mongo1.client.drop_database("shared_test")
+
+
+def test_id_filters_with_operators_and_regex(mongo):
+    items = mongo.db.get_collection("items")
+    items.insert_many([{"_id": "a1"}, {"_id": "a2"}, {"_id": "b1"}])
+    assert items.count_documents({"_id": re.compile("^a")}) == 2
+    assert items.count_documents({"_id": {"$in": ["a1", "b1"]}}) == 2
+    assert items.count_documents({"_id": ["a1"]}) == 0
+    assert items.count_documents({"_id": "b1"}) == 1
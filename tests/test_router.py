@@ -0,0 +1,164 @@
+from datetime import datetime
+
+import pytest
+from bson import Decimal128, ObjectId
+
+from mongodesu import MongoAPI, Model
+from mongodesu.backends import MemoryBackend
+from mongodesu.fields import StringField, NumberField
+from mongodesu.routing import HashRouter, Route, TenantRouter
+from mongodesu.routing.merge import normalize_sort, sort_documents
+
+
+@pytest.fixture
+def clusters():
+    return [MongoAPI(backend=MemoryBackend(), database="app") for _ in range(2)]
+
+
+@pytest.fixture
+def Invoice(clusters):
+    eu, us = clusters
+
+    class Invoice(Model):
+        collection_name = 'invoices'
+        router = TenantRouter({"acme": Route(eu, database="acme"), "globex": Route(us)},
+                              factory=lambda tenant: Route(eu, database=f"tenant_{tenant}"))
+        tenant_id = StringField(required=True)
+        number = StringField(required=True, unique=True)
+        amount = NumberField(required=False)
+
+    return Invoice
+
+
+def count(connection, database, name="invoices"):
+    return connection.db.client.get_database(database).get_collection(name).count_documents({})
+
+
+def test_tenant_routing(Invoice, clusters):
+    eu, us = clusters
+    result = Invoice.insert_many([
+        {"tenant_id": "acme", "number": "A-1", "amount": 10},
+        {"tenant_id": "globex", "number": "G-1", "amount": 20},
+        {"tenant_id": "acme", "number": "A-2", "amount": 30},
+        {"tenant_id": "initech", "number": "I-1", "amount": 40},
+    ])
+    assert len(result.inserted_ids) == 4
+    assert (count(eu, "acme"), count(us, "app"), count(eu, "tenant_initech")) == (2, 1, 1)
+    # The indexes are created on every route
+    assert "number_1" in eu.db.client.get_database("acme").get_collection("invoices").index_information()
+
+    Invoice.insert_one({"tenant_id": "globex", "number": "G-2", "amount": 50})
+    invoice = Invoice(tenant_id="acme", number="A-3", amount=60)
+    invoice.save()
+    invoice.amount = 70
+    invoice.save()
+    assert Invoice.find_one({"tenant_id": "acme", "number": "A-3"}).amount == 70
+    assert Invoice.update_many({"tenant_id": "acme"}, {"$inc": {"amount": 1}}).modified_count == 3
+    assert Invoice.delete_one({"tenant_id": "globex", "number": "G-1"}).deleted_count == 1
+    assert Invoice.count_documents({"tenant_id": {"$in": ["acme", "globex"]}}) == 4
+
+    with pytest.raises(ValueError):
+        Invoice.update_one({"number": "A-1"}, {"$set": {"amount": 0}})
+    with pytest.raises(ValueError):
+        Invoice.insert_one({"number": "X-1"})
+
+
+def test_scatter_gather(Invoice):
+    Invoice.insert_many([{"tenant_id": tenant, "number": f"{tenant}-{i}", "amount": i * 10 + len(tenant)}
+                         for tenant in ("acme", "globex", "initech") for i in range(3)])
+    assert Invoice.count_documents({}) == 9
+    assert Invoice.count_documents({"amount": {"$gte": 20}}) == 3
+    # Sorted, skipped and limited over the documents of all the routes
+    amounts = [invoice.amount for invoice in Invoice.find({}, sort=[("amount", -1)], skip=1, limit=4)]
+    assert amounts == [26, 24, 17, 16]
+    # The paging passed positionally, like `Collection.find(filter, projection, skip, limit)`
+    amounts = [invoice.amount for invoice in Invoice.find({}, None, 1, 4, sort=[("amount", -1)])]
+    assert amounts == [26, 24, 17, 16]
+    assert Invoice.find_one({"number": "globex-1"}).tenant_id == "globex"
+    # The first document of the merged documents, not of the first route
+    assert Invoice.find_one({}, sort=[("amount", -1)]).amount == 27
+    assert Invoice.find_one({}, sort=[("amount", 1)], skip=1).amount == 6
+    assert Invoice.find_one({"amount": {"$gt": 100}}) is None
+
+
+def test_hash_router(clusters):
+    class Event(Model):
+        collection_name = 'events'
+        router = HashRouter(clusters, field="user_id")
+        user_id = NumberField(required=True)
+        name = StringField(required=True)
+
+    Event.insert_many([{"user_id": user_id, "name": "click"} for user_id in range(100)])
+    counts = [connection.db.get_collection("events").count_documents({}) for connection in clusters]
+    assert sum(counts) == 100 and min(counts) > 20
+    assert Event.router.route(42) is Event.router.route(42)
+    assert Event.count_documents({"user_id": 42}) == 1
+    assert Event.count_documents({}) == 100
+
+
+def test_merge_sorts_in_the_server_order():
+    docs = [{"v": "b"}, {"v": Decimal128("2.5")}, {"v": datetime(2025, 1, 1)}, {}, {"v": 3}, {"v": True},
+            {"v": ObjectId()}, {"v": [5, 1]}, {"v": {"a": 1}}]
+    ordered = [doc.get("v") for doc in sort_documents(docs, normalize_sort("v"))]
+    assert ordered[:5] == [None, [5, 1], Decimal128("2.5"), 3, "b"]
+    assert [type(value) for value in ordered[5:]] == [dict, ObjectId, bool, datetime]
+    # Descending, an array is sorted by its largest item
+    docs = [{"v": 3}, {}, {"v": [5, 1]}, {"v": "b"}]
+    assert [doc.get("v") for doc in sort_documents(docs, normalize_sort([("v", -1)]))] == ["b", [5, 1], 3, None]
+
+
+def test_routes_resolve_the_connection_lazily():
+    connection = MongoAPI()
+    connection.db = None # Not connected, whatever `MongoAPI.connect` connected the other modules to
+
+    class Ticket(Model):
+        collection_name = 'tickets'
+        router = TenantRouter({"acme": Route(connection, database="acme"), "globex": Route(connection)})
+        tenant_id = StringField(required=True)
+
+    with pytest.raises(ValueError):
+        Ticket.count_documents({"tenant_id": "acme"})
+
+    connection.connect_one(backend=MemoryBackend(), database="app")
+    Ticket.insert_many([{"tenant_id": "acme"}, {"tenant_id": "globex"}])
+    assert count(connection, "acme", "tickets") == 1 and count(connection, "app", "tickets") == 1
+    route = Ticket.router.route("acme")
+    assert route.binding(Ticket) is route.binding(Ticket)
+
+    connection.connect_one(backend=MemoryBackend(), database="app") # Connected again to an empty cluster
+    assert Ticket.count_documents({}) == 0
+    Ticket.insert_one({"tenant_id": "acme"})
+    assert count(connection, "acme", "tickets") == 1
+
+
+def test_tenant_listing_for_scatter(clusters):
+    eu, _ = clusters
+    eu.db.client.get_database("tenant_hooli").get_collection("orders").insert_one({"tenant_id": "hooli"})
+
+    class Order(Model):
+        collection_name = 'orders'
+        router = TenantRouter(factory=lambda tenant: Route(eu, database=f"tenant_{tenant}"))
+        tenant_id = StringField(required=True)
+
+    Order.insert_one({"tenant_id": "acme"})
+    assert Order.count_documents({}) == 1 # hooli is not known in this process
+    Order.router.tenants = lambda: ["acme", "hooli"]
+    assert Order.count_documents({}) == 2
+
+
+def test_tenants_sharing_a_database(clusters):
+    eu, us = clusters
+
+    class Doc(Model):
+        collection_name = 'docs'
+        router = TenantRouter({"a": eu, "b": eu, "c": Route(us)},
+                              factory=lambda tenant: Route(eu))
+        tenant_id = StringField(required=True)
+
+    Doc.insert_many([{"tenant_id": "a"}, {"tenant_id": "b"}, {"tenant_id": "d"}])
+    assert count(eu, "app", "docs") == 3
+    assert len(Doc.find({})) == 3
+    assert Doc.count_documents({}) == 3
+    assert Doc.update_many({"tenant_id": {"$in": ["a", "b"]}}, {"$set": {"seen": True}}).modified_count == 2
+    assert Doc.delete_many({"tenant_id": {"$in": ["a", "d"]}}).deleted_count == 2
+    assert Doc.count_documents({}) == 1
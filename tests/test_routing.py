@@ -0,0 +1,60 @@
+import pytest
+from pymongo.read_preferences import Primary, Secondary, SecondaryPreferred
+
+from mongodesu import Model
+from mongodesu.fields import StringField, NumberField
+from mongodesu.routing import Routing
+
+
+@pytest.fixture
+def Event(mongo):
+    class Event(Model):
+        connection = mongo
+        collection_name = 'events'
+        read_preference = "secondaryPreferred"
+        max_staleness = 120
+        write_concern = {"w": "majority"}
+        name = StringField(required=True)
+        value = NumberField(required=False)
+
+    return Event
+
+
+def test_routing_normalizes_the_options():
+    routing = Routing(read_preference=Secondary(tag_sets=[{"dc": "eu"}], max_staleness=90), read_concern="majority")
+    assert routing == Routing(read_preference="secondary", tag_sets=[{"dc": "eu"}], max_staleness=90,
+                              read_concern="majority")
+    assert Routing().is_default
+    with pytest.raises(ValueError):
+        Routing(read_preference="primary", tag_sets=[{"dc": "eu"}])
+    with pytest.raises(ValueError):
+        Routing(read_preference="secondaries")
+
+
+def test_model_routing(Event):
+    collection = Event().collection
+    assert collection.read_preference == SecondaryPreferred(max_staleness=120)
+    assert collection.write_concern.document == {"w": "majority"}
+    # The handles are cached per routing
+    assert Event().collection is collection
+
+
+def test_per_call_routing(Event):
+    Event.insert_many([{"name": "click", "value": i} for i in range(5)])
+    assert Event.count_documents({}, read_preference="primary") == 5
+    assert Event.count_documents({}, read_preference=Primary()) == 5
+    assert len(Event.find({"value": {"$gte": 3}}, tag_sets=[{"dc": "eu"}])) == 2
+    assert Event.find_one({"value": 1}, read_concern="local").value == 1
+    assert list(Event.aggregate([{"$count": "total"}], read_preference="nearest")) == [{"total": 5}]
+
+    handle = Event().routed_collection(tag_sets=[{"dc": "eu"}])
+    assert handle.read_preference == SecondaryPreferred(tag_sets=[{"dc": "eu"}], max_staleness=120)
+    assert Event().routed_collection(tag_sets=[{"dc": "eu"}]) is handle
+    assert Event().routed_collection() is Event().collection
+
+
+def test_handles_follow_the_recreated_collection(Event, mongo):
+    Event.insert_one({"name": "click"})
+    mongo.db.drop_collection('events')
+    Event.insert_one({"name": "view"})
+    assert [event.name for event in Event.find({})] == ["view"]
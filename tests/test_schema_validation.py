@@ -0,0 +1,111 @@
+from datetime import date, datetime
+
+import pytest
+from pymongo.errors import BulkWriteError, WriteError
+
+from mongodesu import Model
+from mongodesu.fields import StringField, NumberField, ListField, DateField
+
+
+@pytest.fixture
+def User(mongo):
+
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        name = StringField(size=10, required=True)
+        role = StringField(required=False, enum=["admin", "member"])
+        age = NumberField(required=False)
+        tags = ListField(required=False, item_type=str)
+
+    return User
+
+
+def test_json_schema(User):
+    schema = User.json_schema()
+    assert schema["required"] == ["name"]
+    assert schema["properties"]["name"] == {"bsonType": "string", "minLength": 1, "maxLength": 10}
+    assert schema["properties"]["role"] == {"bsonType": ["string", "null"], "enum": ["admin", "member", None]}
+    assert schema["properties"]["age"]["bsonType"] == ["int", "long", "double", "decimal", "null"]
+    assert schema["properties"]["tags"] == {"bsonType": ["array", "null"], "items": {"bsonType": "string"}}
+
+
+def test_enum_is_validated_on_the_client(User):
+    with pytest.raises(ValueError):
+        User.insert_one({"name": "John", "role": "owner", "tags": []})
+    User.insert_one({"name": "John", "role": "admin", "tags": []})
+
+
+def test_server_validation_of_bulk_writes(User):
+    User.apply_schema_validator()
+    User.server_validation = True
+
+    User.insert_many([{"name": "John", "age": 28, "tags": []}, {"name": "Jack", "role": "member", "tags": ["a"]}])
+    john = User.find_one({"name": "John"})
+    assert john.age == 28 and john.role is None
+
+    with pytest.raises(BulkWriteError) as error:
+        User.insert_many([{"name": "Jane", "tags": []}, {"name": "far too long name", "tags": []}])
+    assert error.value.details["writeErrors"][0]["code"] == 121
+    assert User.count_documents({}) == 3 # Ordered, the first document was inserted
+
+    with pytest.raises(WriteError):
+        User.update_one({"name": "John"}, {"$set": {"role": "owner"}})
+    User.update_many({}, {"$set": {"age": 30}})
+    assert User.count_documents({"age": 30}) == 3
+
+
+def test_updates_are_not_validated_by_default(User):
+    User.insert_one({"name": "John", "tags": []})
+    User.update_one({"name": "John"}, {"$set": {"role": "owner"}})
+    assert User.count_documents({"role": "owner"}) == 1
+
+
+def test_validator_actions_and_levels(User):
+    User.insert_one({"name": "John", "tags": []})
+    User.update_one({"name": "John"}, {"$set": {"age": "old"}}) # Invalid, written before the validator
+
+    User.apply_schema_validator(validation_level="moderate")
+    User.server_validation = True
+    User.update_one({"name": "John"}, {"$set": {"role": "owner"}}) # Already invalid, not validated
+    assert User.count_documents({"role": "owner"}) == 1
+
+    User.apply_schema_validator(validation_action="warn")
+    User.insert_many([{"name": "far too long name"}], bypass_document_validation=True)
+    assert User.count_documents({}) == 2
+
+
+def test_client_valid_documents_pass_the_validator(User):
+    class Event(Model):
+        connection = User.connection
+        collection_name = 'events'
+        name = StringField(required=True)
+        at = DateField(required=True)
+        count = NumberField(required=False)
+
+    Event.apply_schema_validator()
+    Event.insert_one({"name": "launch", "at": "2025-01-05T10:30:00", "count": 2})
+    Event.insert_one({"name": "release", "at": date(2025, 2, 1)})
+    event = Event(name="party", at="2025-03-01")
+    event.save()
+    assert Event.count_documents({"at": {"$gte": datetime(2025, 1, 1)}}) == 3
+    with pytest.raises(ValueError):
+        Event.insert_one({"name": "flag", "at": datetime(2025, 1, 1), "count": True})
+
+
+def test_list_item_types_without_a_bson_type(User):
+    class Point:
+        pass
+
+    class Shape(Model):
+        connection = User.connection
+        collection_name = 'shapes'
+        points = ListField(required=False, item_type=Point)
+        labels = ListField(required=False, item_type=(str, int))
+
+    schema = Shape.json_schema()
+    assert "items" not in schema["properties"]["points"]
+    assert schema["properties"]["labels"]["items"] == {"bsonType": ["string", "int", "long"]}
+    Shape.apply_schema_validator()
+    Shape.insert_one({"points": [], "labels": ["a", 1]})
+    assert Shape.count_documents({}) == 1
@@ -0,0 +1,83 @@
+import io
+import json
+import socket
+from datetime import datetime
+
+import bson
+import pytest
+
+from mongodesu import Model
+from mongodesu.fields import StringField, NumberField, DateField, ListField, ObjectId
+
+
+@pytest.fixture
+def User(mongo):
+
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        name = StringField(required=True)
+        age = NumberField(required=False, default=0)
+        created_at = DateField(required=False)
+        tags = ListField(required=False, default=["new"])
+
+    return User
+
+
+def test_to_json_handles_object_id_and_dates(User):
+    user = User(name="John", age=28, created_at=datetime(2025, 1, 5, 10, 30), tags=["a"])
+    user.save()
+
+    data = json.loads(user.to_json())
+    assert data == {"name": "John", "age": 28, "created_at": "2025-01-05T10:30:00", "tags": ["a"],
+                    "_id": str(user._id)}
+    assert json.loads(user.to_json(fast=True)) == data
+    assert user.to_json() == json.dumps(json.loads(user.to_json()))
+
+
+def test_export_ndjson_applies_the_defaults(User):
+    User.insert_one({"name": "John"})
+    User.update_many({}, {"$set": {"age": None}})
+    binary = io.BytesIO()
+    User.export_ndjson({}, binary)
+    user = User.find_one({"name": "John"})
+    assert json.loads(binary.getvalue()) == json.loads(user.to_json())
+    assert json.loads(binary.getvalue())["age"] == 0
+
+
+def test_to_dict_uses_the_declared_fields(User):
+    user = User(name="John")
+    assert user.to_dict() == {"name": "John", "age": 0, "created_at": None, "tags": ["new"]}
+
+
+def test_to_bson(User):
+    user = User(name="John", created_at=datetime(2025, 1, 5))
+    user._id = ObjectId()
+    assert bson.decode(user.to_bson()) == user.to_dict()
+
+
+def test_export_ndjson(User):
+    User.insert_many([{"name": f"user{i}", "age": i} for i in range(25)])
+    User.update_many({}, {"$set": {"internal": True}}) # Not a declared field, so not exported
+
+    binary = io.BytesIO()
+    assert User.export_ndjson({"age": {"$gte": 5}}, binary, batch_size=7, sort="age") == 20
+    lines = binary.getvalue().decode().splitlines()
+    assert len(lines) == 20
+    first = json.loads(lines[0])
+    assert set(first) == {"_id", "name", "age", "created_at", "tags"}
+    assert first["name"] == "user5" and first["tags"] == ["new"]
+
+    text = io.StringIO()
+    User.export_ndjson({"age": 1}, text)
+    assert json.loads(text.getvalue())["name"] == "user1"
+
+
+def test_export_ndjson_to_socket(User):
+    User.insert_many([{"name": "John"}, {"name": "Jack"}])
+    left, right = socket.socketpair()
+    with left, right:
+        assert User.export_ndjson({}, left) == 2
+        left.shutdown(socket.SHUT_WR)
+        received = right.makefile("rb").read()
+    assert [json.loads(line)["name"] for line in received.splitlines()] == ["John", "Jack"]
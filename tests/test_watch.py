@@ -0,0 +1,87 @@
+import pytest
+
+from mongodesu import Model
+from mongodesu.changes import CollectionTokenStore, MemoryTokenStore
+from mongodesu.fields import StringField, NumberField
+
+
+@pytest.fixture
+def User(mongo):
+    class User(Model):
+        connection = mongo
+        collection_name = 'users'
+        name = StringField(required=True)
+        email = StringField(required=False)
+        age = NumberField(required=False)
+
+    return User
+
+
+def test_changes_are_hydrated(User):
+    with User.watch(max_await_time_ms=10) as stream:
+        User.insert_one({"name": "John", "email": "john@example.com", "age": 28})
+        User.update_one({"name": "John"}, {"$set": {"age": 29}})
+        User.delete_one({"name": "John"})
+
+        insert, update, delete = stream.try_next(), stream.try_next(), stream.try_next()
+
+    assert insert.operation_type == "insert"
+    assert isinstance(insert.instance, User) and insert.instance.email == "john@example.com"
+    assert update.operation_type == "update"
+    assert update.updated_fields == {"age": 29}
+    assert update.instance.age == 29 and update.instance.name == "John"
+    assert delete.operation_type == "delete" and delete.instance is None
+    assert delete.document_id == insert.instance._id
+
+
+def test_pipeline_and_fields(User):
+    with User.watch(pipeline=[{"$match": {"operationType": "insert"}}], fields=["name"], max_await_time_ms=10) as stream:
+        User.insert_one({"name": "John", "email": "john@example.com"})
+        User.update_one({"name": "John"}, {"$set": {"age": 29}})
+        User.insert_one({"name": "Jack", "email": "jack@example.com"})
+        events = [stream.try_next(), stream.try_next(), stream.try_next()]
+
+    assert [event.instance.name for event in events[:2]] == ["John", "Jack"]
+    assert events[2] is None
+    assert events[0].raw["fullDocument"].keys() == {"_id", "name"}
+
+
+def test_incremental_hydration_without_full_document(User):
+    with User.watch(full_document=None, max_await_time_ms=10) as stream:
+        User.insert_one({"name": "John"})
+        User.update_one({"name": "John"}, {"$set": {"age": 30}})
+        stream.try_next()
+        update = stream.try_next()
+    assert "fullDocument" not in update.raw
+    assert update.instance.age == 30
+    assert update.instance._id == update.document_id
+
+
+def test_resume_from_token_store(User, mongo):
+    store = CollectionTokenStore(mongo)
+    stream = User.watch(token_store=store, name="indexer", max_await_time_ms=10)
+    User.insert_one({"name": "John"})
+    User.insert_one({"name": "Jack"})
+    assert stream.try_next().instance.name == "John"
+    stream.close() # John was processed, Jack was not read
+
+    User.insert_one({"name": "Jane"})
+    with User.watch(token_store=store, name="indexer", max_await_time_ms=10) as resumed:
+        assert [resumed.try_next().instance.name, resumed.try_next().instance.name] == ["Jack", "Jane"]
+
+
+def test_batches_and_invalidation(User):
+    invalidated = []
+    store = MemoryTokenStore()
+    stream = User.watch(token_store=store, on_change=[lambda event: invalidated.append(event.document_id)],
+                        max_await_time_ms=1)
+    User.insert_many([{"name": f"user{i}"} for i in range(5)])
+
+    batches = stream.batches(max_size=2, max_wait=0.05)
+    sizes = [len(next(batches)), len(next(batches)), len(next(batches))]
+    assert sizes == [2, 2, 1]
+    assert len(invalidated) == 5
+    stream.close()
+    # The last batch was not acknowledged by asking for the next one, so only the first 4 changes are committed
+    with User.watch(token_store=store, max_await_time_ms=1) as resumed:
+        assert resumed.try_next().instance.name == "user4"
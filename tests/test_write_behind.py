@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from mongodesu import Model
+from mongodesu.fields import StringField, NumberField
+from mongodesu.routing import Route, TenantRouter
+from mongodesu.writebehind import WriteBehindBuffer
+
+
+def audit_model(mongo, buffer):
+    class AuditLog(Model):
+        connection = mongo
+        collection_name = 'audit_logs'
+        write_behind = buffer
+        action = StringField(required=True)
+        user_id = NumberField(required=False)
+
+    return AuditLog
+
+
+def test_flush_by_size(mongo):
+    buffer = WriteBehindBuffer(batch_size=5, flush_interval=60)
+    AuditLog = audit_model(mongo, buffer)
+    results = [AuditLog.insert_one({"action": "login", "user_id": i}) for i in range(12)]
+    assert not results[0].acknowledged and results[0].inserted_id is not None
+
+    assert buffer.flush(timeout=5)
+    assert mongo.db.get_collection("audit_logs").count_documents({}) == 12
+    assert mongo.db.get_collection("audit_logs").find_one({"user_id": 3})["_id"] == results[3].inserted_id
+    assert buffer.written.value(buffer.labels) == 12
+    assert buffer.flush_duration.count(buffer.labels) == 3
+    buffer.close()
+
+
+def test_id_set_on_the_inserted_document(mongo):
+    buffer = WriteBehindBuffer(batch_size=100, flush_interval=60)
+    AuditLog = audit_model(mongo, buffer)
+    document = {"action": "login", "user_id": 1}
+    result = AuditLog.insert_one(document)
+    assert document["_id"] == result.inserted_id
+    document["action"] = "logout" # The buffered document is not changed by the caller
+    buffer.close()
+    assert mongo.db.get_collection("audit_logs").find_one({"_id": document["_id"]})["action"] == "login"
+
+
+def test_flush_by_time(mongo):
+    buffer = WriteBehindBuffer(batch_size=100, flush_interval=0.05)
+    AuditLog = audit_model(mongo, buffer)
+    log = AuditLog(action="logout")
+    log.save()
+    deadline = time.monotonic() + 5
+    while mongo.db.get_collection("audit_logs").count_documents({}) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert mongo.db.get_collection("audit_logs").find_one({})["_id"] == log._id
+    buffer.close()
+
+
+def test_drop_policy(mongo):
+    buffer = WriteBehindBuffer(max_size=2, batch_size=100, flush_interval=60, policy="drop")
+    AuditLog = audit_model(mongo, buffer)
+    for i in range(3):
+        AuditLog.insert_one({"action": "login", "user_id": i})
+    assert buffer.pending == 2 and buffer.dropped.value(buffer.labels) == 1
+    assert "mongodesu_write_behind_depth{buffer=\"default\"} 2" in buffer.render()
+
+    buffer.close() # Flushes the pending documents
+    assert mongo.db.get_collection("audit_logs").count_documents({}) == 2
+    with pytest.raises(RuntimeError):
+        AuditLog.insert_one({"action": "login"})
+
+
+def test_spill_policy(mongo, tmp_path):
+    buffer = WriteBehindBuffer(max_size=2, batch_size=100, flush_interval=60, policy="spill",
+                               spill_path=str(tmp_path / "audit.bson"))
+    AuditLog = audit_model(mongo, buffer)
+    for i in range(3):
+        AuditLog.insert_one({"action": "login", "user_id": i})
+    buffer.close()
+    assert mongo.db.get_collection("audit_logs").count_documents({}) == 2
+    assert buffer.replay_spill(mongo) == 1
+    assert mongo.db.get_collection("audit_logs").count_documents({"user_id": 2}) == 1
+    assert buffer.replay_spill(mongo) == 0
+
+
+def test_spilled_documents_are_replayed_into_their_database(mongo, tmp_path):
+    buffer = WriteBehindBuffer(max_size=1, batch_size=100, flush_interval=60, policy="spill",
+                               spill_path=str(tmp_path / "audit.bson"))
+    AuditLog = audit_model(mongo, buffer)
+    AuditLog.router = TenantRouter({"acme": Route(mongo, database="acme")}, field="action")
+    for i in range(3):
+        AuditLog.insert_one({"action": "acme", "user_id": i})
+    buffer.close()
+    acme = mongo.db.client.get_database("acme").get_collection("audit_logs")
+    assert acme.count_documents({}) == 1
+    assert buffer.replay_spill(mongo) == 2
+    assert acme.count_documents({}) == 3
+    assert mongo.db.get_collection("audit_logs").count_documents({}) == 0
+
+
+def test_block_policy(mongo):
+    buffer = WriteBehindBuffer(max_size=2, batch_size=100, flush_interval=0.05)
+    AuditLog = audit_model(mongo, buffer)
+    for i in range(5): # Blocks until the pending documents are flushed on the interval
+        AuditLog.insert_one({"action": "login", "user_id": i})
+    buffer.close()
+    assert mongo.db.get_collection("audit_logs").count_documents({}) == 5
+    assert buffer.dropped.value(buffer.labels) == 0
+
+
+def test_writer_survives_failed_batches(mongo, tmp_path):
+    buffer = WriteBehindBuffer(max_size=2, batch_size=1, flush_interval=60, spill_path=str(tmp_path / "missing" / "audit.bson"))
+    AuditLog = audit_model(mongo, buffer)
+    collection = mongo.db.get_collection("audit_logs")
+    original = collection.insert_many
+
+    def failing_insert_many(*args, **kwargs):
+        raise RuntimeError("down")
+
+    collection.insert_many = failing_insert_many # The spill to the missing directory fails too
+    AuditLog.insert_one({"action": "login", "user_id": 1})
+    assert buffer.flush(timeout=5)
+    assert buffer.failed.value(buffer.labels) == 1
+
+    collection.insert_many = original
+    for i in range(4): # Blocks until the thread writes the documents
+        AuditLog.insert_one({"action": "login", "user_id": i})
+    assert buffer.close(timeout=5)
+    assert collection.count_documents({}) == 4